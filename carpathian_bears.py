@@ -1067,18 +1067,20 @@ def create_movement_map(data, show_labels=True, line_width=3, show_points=True,
         
         # Add points
         if show_points:
-            for _, row in bear_data.iterrows():
+            # Walk plain column lists rather than iterrows, which builds a Series per point
+            point_columns = (bear_data[col].tolist() for col in ['bear_id', 'sex', 'age', 'season', 'timestamp', 'lat', 'lng'])
+            for point_bear_id, sex, age, season, timestamp, lat, lng in zip(*point_columns):
                 # Create popup content
                 popup_content = f"""
-                <b>Bear ID:</b> {row['bear_id']}<br>
-                <b>Sex:</b> {row['sex']}<br>
-                <b>Age:</b> {row['age']}<br>
-                <b>Season:</b> {row['season']}<br>
-                <b>Time:</b> {row['timestamp']}
+                <b>Bear ID:</b> {point_bear_id}<br>
+                <b>Sex:</b> {sex}<br>
+                <b>Age:</b> {age}<br>
+                <b>Season:</b> {season}<br>
+                <b>Time:</b> {timestamp}
                 """
                 
                 folium.CircleMarker(
-                    location=[row['lat'], row['lng']],
+                    location=[lat, lng],
                     radius=point_size,
                     color=color,
                     fill=True,
@@ -12,6 +12,7 @@ import os
 from datetime import datetime
 import pyproj
 from pyproj import Transformer
+from wildlife_db import WildlifeDatabase
 
 def inspect_and_fix_database(db_path="wildlife_data.db"):
     """Comprehensive check and fix of the Carpathian Bears database"""
@@ -158,6 +159,9 @@ def inspect_and_fix_database(db_path="wildlife_data.db"):
         # Check related tables
         check_related_tables(conn)
         
+        # The seasonal summary is derived from bears_tracking, so rebuild it after any fixes above
+        WildlifeDatabase(db_path).refresh_seasonal_stats()
+        
         print("\n" + "=" * 50)
         print("DIAGNOSTICS COMPLETE")
         print("=" * 50)
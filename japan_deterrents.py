@@ -1,14 +1,60 @@
 import streamlit as st
 import pandas as pd
 import folium
-from folium.plugins import Draw
-from streamlit_folium import st_folium
+from folium.plugins import Draw, FastMarkerCluster
+import streamlit.components.v1 as components
 import os
+import io
 import datetime
-import json
 from datetime import datetime as dt
+from calendar import monthrange
 from wildlife_db import WildlifeDatabase  # Import the database handler
 
+# Japanese tile layers as (tiles, attr, name, overlay, opacity)
+BASE_LAYERS = [
+    ("https://cyberjapandata.gsi.go.jp/xyz/std/{z}/{x}/{y}.png", "GSI Japan", "GSI Standard Map", False, 1.0),
+    ("https://cyberjapandata.gsi.go.jp/xyz/relief/{z}/{x}/{y}.png", "GSI Japan", "GSI Terrain Map", False, 1.0),
+    ("https://cyberjapandata.gsi.go.jp/xyz/seamlessphoto/{z}/{x}/{y}.jpg", "GSI Japan", "GSI Satellite Imagery", False, 1.0),
+    ("https://disaportaldata.gsi.go.jp/raster/01_flood_l2_shinsuishin_data/{z}/{x}/{y}.png", "GSI Japan Hazard Maps", "Japan Flood Hazard Map", True, 0.7),
+    ("https://cyberjapandata.gsi.go.jp/xyz/woodland/{z}/{x}/{y}.png", "GSI Japan", "Japan Forest Map", True, 0.7),
+]
+
+# Stylesheet for the custom marker ID labels, added once per map
+PIN_ICON_CSS = (
+    "<style>.pin-icon{background-color:#3186cc;color:white;border-radius:50%;"
+    "text-align:center;line-height:30px;width:30px;height:30px;"
+    "font-weight:bold;font-size:12px;box-shadow:0 0 10px rgba(0,0,0,0.3);}</style>"
+)
+
+# Fill and outline for saved areas
+POLYGON_STYLE = {"color": "green", "fillColor": "green", "fillOpacity": 0.2}
+
+# Client-side builder for custom markers; each row is [lat, lng, id, timestamp]
+MARKER_CALLBACK_JS = """
+function (row) {
+    var icon = L.divIcon({html: '<div class="pin-icon">' + row[2] + '</div>', className: ''});
+    var marker = L.marker(new L.LatLng(row[0], row[1]), {icon: icon});
+    marker.bindPopup(
+        '<div><b>ID:</b> ' + row[2] + '<br>' +
+        '<b>Time:</b> ' + row[3] + '<br>' +
+        '<b>Location:</b> ' + row[0].toFixed(6) + ', ' + row[1].toFixed(6) + '<br></div>',
+        {maxWidth: 300}
+    );
+    return marker;
+}
+"""
+
+# Client-side builder for deterrent devices; each row is [lat, lng, popup_html, tooltip]
+DETERRENT_CALLBACK_JS = """
+function (row) {
+    var icon = L.AwesomeMarkers.icon({icon: 'warning-sign', markerColor: 'red', prefix: 'glyphicon'});
+    var marker = L.marker(new L.LatLng(row[0], row[1]), {icon: icon});
+    marker.bindPopup(row[2], {maxWidth: 300});
+    marker.bindTooltip(row[3]);
+    return marker;
+}
+"""
+
 class JapanDeterrentSystem:
     """
     Class to handle the Japan Bear Deterrent System visualization and functionality.
@@ -17,26 +63,14 @@ class JapanDeterrentSystem:
     
     def __init__(self):
         """Initialize the Japan Deterrent System."""
-        # Initialize the database connection
+        # Initialize the database connection. The instance is shared across sessions (map.py caches it),
+        # so it holds no data; deterrents are read through the fingerprint-keyed cache on each run
         self.db = WildlifeDatabase("wildlife_data.db")
-        
-        # Load data at startup
-        self.existing_markers = self.load_existing_data()
-        self.existing_polygons = self.load_polygon_data()
-        self.deterrent_data = self.load_deterrent_data()
-        
-        # Determine map center
-        if len(self.deterrent_data) > 0:
-            first_point = self.deterrent_data.iloc[0]
-            self.map_center = [first_point['lat'], first_point['lng']]
-        else:
-            # Default center - Central Japan (adjusted for better view)
-            self.map_center = [36.2048, 138.2529]
     
-    # Note the _self parameter to make it cacheable
-    @st.cache_data(ttl=3600)  # Cache for 1 hour
+    # Note the _self parameter to make it cacheable; db_mtime invalidates it when the index changes
+    @st.cache_data
     def get_image_files(_self, device_id, image_type="device", start_date=None, end_date=None, 
-                         include_unsuccessful=False, daily_time_filter=None, limit=100, offset=0):
+                         include_unsuccessful=False, daily_time_filter=None, limit=100, offset=0, db_mtime=None):
         """
         Get filtered images for a device from the database
         
@@ -49,6 +83,7 @@ class JapanDeterrentSystem:
             daily_time_filter (tuple, optional): (start_hour, end_hour) for filtering by time of day
             limit (int): Maximum number of results to return
             offset (int): Offset for pagination
+            db_mtime (tuple, optional): Database fingerprint from _db_mtime(), used only as cache key
             
         Returns:
             list: List of image paths and metadata that match the criteria
@@ -62,294 +97,264 @@ class JapanDeterrentSystem:
             daily_time_filter=daily_time_filter,
             include_unsuccessful=include_unsuccessful,
             limit=limit,
-            offset=offset
+            offset=offset,
+            columns=("image_path", "filename", "timestamp", "parsed_successfully")
         )
         
         # Convert to list of dictionaries with image paths
         if df.empty:
             return []
+        
+        # Format the caption dates for the whole result at once
+        df['date_info'] = pd.to_datetime(df['timestamp'], errors='coerce').dt.strftime("%Y-%m-%d %H:%M").fillna("")
             
         return df.to_dict('records')
     
-    # Note the _self parameter to make it cacheable
-    @st.cache_data(ttl=3600)  # Cache for 1 hour
-    def format_device_id(_self, raw_device_id):
-        """Format device ID with consistent padding"""
-        if isinstance(raw_device_id, (int, float)):
-            # It's a number - format with leading zeros (6 digits)
-            return f"{int(raw_device_id):06d}"
-        else:
-            # It's already a string
-            device_id = str(raw_device_id)
-            # If it's a numeric string but missing leading zeros, add them
-            if device_id.isdigit() and len(device_id) < 6:
-                return device_id.zfill(6)
-            return device_id
-
-    def load_existing_data(self):
+    # Note the _self parameter to make it cacheable; db_mtime invalidates it when the index changes
+    @st.cache_data(show_spinner=False)
+    def get_image_total(_self, device_id, image_type="device", start_date=None, end_date=None,
+                        include_unsuccessful=False, daily_time_filter=None, db_mtime=None):
+        """Count the images matching the same filters as get_image_files"""
+        return _self.db.get_image_count(device_id, image_type=image_type, include_unsuccessful=include_unsuccessful,
+                                        start_date=start_date, end_date=end_date, daily_time_filter=daily_time_filter)
+    
+    def _db_mtime(self):
+        """Cache key that changes whenever the database (or its WAL file) is written"""
+        fingerprint = []
+        for path in (self.db.db_path, self.db.db_path + "-wal"):
+            try: stat = os.stat(path)
+            except FileNotFoundError: continue
+            fingerprint.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(fingerprint)
+
+    # Note the _self parameter to make it cacheable; db_mtime is the actual cache key
+    @st.cache_data(show_spinner=False)
+    def _load_markers_cached(_self, db_mtime):
+        return _self.db.get_markers()
+
+    @st.cache_data(show_spinner=False)
+    def _load_polygons_cached(_self, db_mtime):
+        return _self.db.get_polygons()
+
+    @st.cache_data(show_spinner=False)
+    def _load_deterrents_cached(_self, db_mtime):
+        deterrents_df = _self.db.get_deterrent_devices()
+        id_col = 'id' if 'id' in deterrents_df.columns else 'directory_name'
+        if not deterrents_df.empty and id_col in deterrents_df.columns:
+            # Zero-pad numeric IDs to six digits once here for the whole column
+            raw_ids = deterrents_df[id_col].astype(str)
+            needs_padding = raw_ids.str.isdigit() & (raw_ids.str.len() < 6)
+            deterrents_df['device_id'] = raw_ids.mask(needs_padding, raw_ids.str.zfill(6))
+        return deterrents_df
+
+    # Note the _self parameter to make it cacheable; mtime invalidates edited files.
+    # Bounded so browsing many pages doesn't grow the cache without limit
+    @st.cache_data(max_entries=256, show_spinner=False)
+    def get_thumbnail(_self, img_path, mtime, max_size=(480, 480)):
+        """Downscaled JPEG bytes for an image, so the sidebar never embeds full-size files"""
+        from PIL import Image
+        with Image.open(img_path) as img:
+            img.thumbnail(max_size)
+            buffer = io.BytesIO()
+            img.convert("RGB").save(buffer, "JPEG", quality=80)
+        return buffer.getvalue()
+
+    def load_existing_data(self, db_mtime=None):
         """Load custom marker data from database"""
-        return self.db.get_markers()
+        return self._load_markers_cached(self._db_mtime() if db_mtime is None else db_mtime)
 
-    def load_polygon_data(self):
+    def load_polygon_data(self, db_mtime=None):
         """Load polygon data from database"""
-        return self.db.get_polygons()
+        return self._load_polygons_cached(self._db_mtime() if db_mtime is None else db_mtime)
 
-    def load_deterrent_data(self):
+    def load_deterrent_data(self, db_mtime=None):
         """Load deterrent device data from database"""
-        return self.db.get_deterrent_devices()
-
-    def get_next_id(self):
-        """Get next available ID for markers"""
-        return self.db.get_next_marker_id()
-
-    def get_next_polygon_id(self):
-        """Get next available ID for polygons"""
-        next_id = self.db.get_next_polygon_id()
-        return next_id
-
-    def save_coordinates_from_geojson(self, drawings):
-        """Save coordinates from GeoJSON drawings"""
+        return self._load_deterrents_cached(self._db_mtime() if db_mtime is None else db_mtime)
+
+    def get_map_center(self, deterrents_df):
+        """Map center on the first deterrent device, or central Japan when there are none"""
+        if len(deterrents_df) > 0:
+            first_point = deterrents_df.iloc[0]
+            return [first_point['lat'], first_point['lng']]
+        # Default center - Central Japan (adjusted for better view)
+        return [36.2048, 138.2529]
+
+    def get_next_id(self, markers_df=None):
+        """Get next available ID for markers, from an already-loaded frame when given"""
+        if markers_df is None:
+            return self.db.get_next_marker_id()
+        if markers_df.empty or 'id' not in markers_df.columns:
+            return 1
+        # Non-numeric IDs become NaN and are ignored by max()
+        max_id = pd.to_numeric(markers_df['id'], errors='coerce').max()
+        return 1 if pd.isna(max_id) else int(max_id) + 1
+
+    def get_next_polygon_id(self, polygons_df=None):
+        """Get next available ID for polygons, from an already-loaded frame when given"""
+        if polygons_df is None:
+            return self.db.get_next_polygon_id()
+        if polygons_df.empty or 'polygon_id' not in polygons_df.columns:
+            return 1
+        # IDs not of the form poly-<n> become NaN and are ignored by max()
+        max_id = pd.to_numeric(polygons_df['polygon_id'].astype(str).str.extract(r'^poly-(\d+)$', expand=False)).max()
+        return 1 if pd.isna(max_id) else int(max_id) + 1
+
+    def save_coordinates_from_geojson(self, drawings, markers_df=None, polygons_df=None):
+        """Save coordinates from GeoJSON drawings.
+
+        The next marker/polygon IDs are computed once from the given (or freshly loaded)
+        frames, then all new rows are written in one batch per table.
+        """
         if not drawings:
             return [], []
+        markers_df = self.load_existing_data() if markers_df is None else markers_df
+        polygons_df = self.load_polygon_data() if polygons_df is None else polygons_df
         
         saved_points = []
         saved_polygons = []
         
-        for drawing in drawings:
-            if drawing['geometry']['type'] == 'Point':
-                # Extract coordinates (GeoJSON format is [lng, lat])
-                lng, lat = drawing['geometry']['coordinates']
-                
-                # Get next ID and format it
-                next_id = self.get_next_id()
-                marker_id = str(next_id).zfill(4)
-                
-                # Save to database
-                self.db.save_marker(marker_id, lat, lng)
-                
-                saved_points.append((lat, lng, marker_id))
-                
-            elif drawing['geometry']['type'] == 'Polygon':
-                # Extract polygon coordinates (GeoJSON format is [[[lng, lat], [lng, lat], ...]])
-                # Note: First and last point are the same in GeoJSON polygons
-                coordinates = drawing['geometry']['coordinates'][0]
-                
-                # Get next polygon ID
-                next_id = self.get_next_polygon_id()
-                polygon_id = f"poly-{next_id}"
-                
-                # We'll use a default name initially
-                name = f"Area {next_id}"
-                
-                # Save to database
-                self.db.save_polygon(polygon_id, name, coordinates)
-                
-                saved_polygons.append((coordinates, polygon_id, name))
+        # Split the drawings by geometry type up front (GeoJSON coordinates are [lng, lat])
+        # Note: First and last point are the same in GeoJSON polygons
+        geometries = [drawing['geometry'] for drawing in drawings]
+        point_coords = [geometry['coordinates'] for geometry in geometries if geometry['type'] == 'Point']
+        polygon_coords = [geometry['coordinates'][0] for geometry in geometries if geometry['type'] == 'Polygon']
+        
+        # Number the new markers and polygons from the current next IDs;
+        # polygons get a default name initially
+        if point_coords:
+            next_id = self.get_next_id(markers_df)
+            saved_points = [(lat, lng, str(next_id + i).zfill(4)) for i, (lng, lat) in enumerate(point_coords)]
+        if polygon_coords:
+            next_id = self.get_next_polygon_id(polygons_df)
+            saved_polygons = [(coordinates, f"poly-{next_id + i}", f"Area {next_id + i}") for i, coordinates in enumerate(polygon_coords)]
         
-        # Refresh the data
-        self.existing_markers = self.load_existing_data()
-        self.existing_polygons = self.load_polygon_data()
+        # Insert everything in one transaction
+        if (saved_points or saved_polygons) and not self.db.save_drawings(
+            [(marker_id, lat, lng) for lat, lng, marker_id in saved_points],
+            [(polygon_id, name, coordinates) for coordinates, polygon_id, name in saved_polygons],
+        ):
+            return [], []
         
         return saved_points, saved_polygons
 
     def delete_marker(self, marker_id):
         """Delete a single marker by ID"""
-        result = self.db.delete_marker(marker_id)
-        if result:
-            # Refresh the data
-            self.existing_markers = self.load_existing_data()
-        return result
+        return self.delete_markers([marker_id])
+
+    def delete_markers(self, marker_ids):
+        """Delete several markers by ID in one database round-trip"""
+        return self.db.delete_markers(marker_ids)
 
     def delete_polygon(self, polygon_id):
         """Delete a single polygon by ID"""
-        result = self.db.delete_polygon(polygon_id)
-        if result:
-            # Refresh the data
-            self.existing_polygons = self.load_polygon_data()
-        return result
+        return self.delete_polygons([polygon_id])
+
+    def delete_polygons(self, polygon_ids):
+        """Delete several polygons by ID in one database round-trip"""
+        return self.db.delete_polygons(polygon_ids)
 
     def delete_all_markers(self):
         """Delete all markers"""
-        result = self.db.delete_all_markers()
-        if result:
-            # Refresh the data
-            self.existing_markers = self.load_existing_data()
-        return result
+        return self.db.delete_all_markers()
 
     def delete_all_polygons(self):
         """Delete all polygons"""
-        result = self.db.delete_all_polygons()
-        if result:
-            # Refresh the data
-            self.existing_polygons = self.load_polygon_data()
-        return result
+        return self.db.delete_all_polygons()
 
     def update_polygon_name(self, polygon_id, new_name):
         """Update polygon name"""
-        result = self.db.update_polygon_name(polygon_id, new_name)
-        if result:
-            # Refresh the data
-            self.existing_polygons = self.load_polygon_data()
-        return result
-
-    def create_map(self):
-        """Create a Folium map with all markers, deterrents, and polygons"""
+        return self.db.update_polygon_name(polygon_id, new_name)
+
+    def create_map(self, markers_df=None, deterrents_df=None, polygons_df=None, db_mtime=None):
+        """Create a Folium map with all markers, deterrents, and polygons.
+
+        Already-loaded frames can be passed in to avoid re-reading them from the database;
+        pass the db_mtime they were loaded with so the map is keyed to the same version.
+        The built map is reused across reruns until the database changes.
+        """
+        db_mtime = self._db_mtime() if db_mtime is None else db_mtime
+        markers_df = self.load_existing_data(db_mtime) if markers_df is None else markers_df
+        deterrents_df = self.load_deterrent_data(db_mtime) if deterrents_df is None else deterrents_df
+        polygons_df = self.load_polygon_data(db_mtime) if polygons_df is None else polygons_df
+        return self._create_map_cached(markers_df, deterrents_df, polygons_df, db_mtime)
+
+    # The frames are not hashed (leading underscore); the database fingerprint is the cache key
+    @st.cache_resource(max_entries=1)
+    def _create_map_cached(_self, _markers_df, _deterrents_df, _polygons_df, fingerprint):
+        return _self._build_map(_markers_df, _deterrents_df, _polygons_df)
+
+    @st.cache_resource(max_entries=1)
+    def _render_map_html(_self, _m, fingerprint):
+        """Rendered HTML of a cached map, so the static view renders it once per database version"""
+        return _m.get_root().render()
+
+    def _build_map(self, markers_df, deterrents_df, polygons_df):
+        """Build the Folium map from the given frames"""
         # Initialize map with OpenStreetMap as the default base layer
-        m = folium.Map(location=self.map_center, zoom_start=10, control_scale=True)
-        
-        # Add Japanese map layers
-        # 1. GSI Standard Map (set as default base map)
-        gsi_standard = folium.TileLayer(
-            tiles="https://cyberjapandata.gsi.go.jp/xyz/std/{z}/{x}/{y}.png",
-            attr="GSI Japan",
-            name="GSI Standard Map",
-            overlay=False,
-        )
-        gsi_standard.add_to(m)
+        m = folium.Map(location=self.get_map_center(deterrents_df), zoom_start=10, control_scale=True)
         
-        # 2. GSI Terrain Map
-        folium.TileLayer(
-            tiles="https://cyberjapandata.gsi.go.jp/xyz/relief/{z}/{x}/{y}.png",
-            attr="GSI Japan",
-            name="GSI Terrain Map",
-            overlay=False,
-        ).add_to(m)
-        
-        # 3. GSI Satellite Imagery
-        folium.TileLayer(
-            tiles="https://cyberjapandata.gsi.go.jp/xyz/seamlessphoto/{z}/{x}/{y}.jpg",
-            attr="GSI Japan",
-            name="GSI Satellite Imagery",
-            overlay=False,
-        ).add_to(m)
-        
-        # 4. Japan Hazard Map
-        folium.TileLayer(
-            tiles="https://disaportaldata.gsi.go.jp/raster/01_flood_l2_shinsuishin_data/{z}/{x}/{y}.png",
-            attr="GSI Japan Hazard Maps",
-            name="Japan Flood Hazard Map",
-            overlay=True,
-            opacity=0.7,
-        ).add_to(m)
-        
-        # 5. Japan Forest Map
-        folium.TileLayer(
-            tiles="https://cyberjapandata.gsi.go.jp/xyz/woodland/{z}/{x}/{y}.png",
-            attr="GSI Japan",
-            name="Japan Forest Map",
-            overlay=True,
-            opacity=0.7,
-        ).add_to(m)
+        # Add Japanese map layers (GSI Standard Map first, as the default base map)
+        for tiles, attr, name, overlay, opacity in BASE_LAYERS:
+            folium.TileLayer(tiles=tiles, attr=attr, name=name, overlay=overlay, opacity=opacity).add_to(m)
         
         # Add existing deterrent devices with simple popups
-        for _, row in self.deterrent_data.iterrows():
-            # Get the device ID
-            raw_device_id = row.get('directory_name', row.get('id', ''))
-            device_id = self.format_device_id(raw_device_id)
-            
-            # Get image counts from the database
-            device_image_count = self.db.get_image_count(device_id, "device")
-            trail_image_count = self.db.get_image_count(device_id, "trail")
+        if not deterrents_df.empty and 'device_id' in deterrents_df.columns:
+            # Counts for all devices in one query instead of two per device
+            image_counts = self.db.get_image_counts()
             
-            # Create a simple popup with counts and ID info
-            popup_html = f"""
-            <div style="min-width: 200px; padding: 10px;">
-                <h3>Deterrent ID: {device_id}</h3>
-                <p>Location: {row['lat']:.6f}, {row['lng']:.6f}</p>
-                <p>Available images:</p>
-                <ul>
-                    <li>Device Images: {device_image_count}</li>
-                    <li>Trail Images: {trail_image_count}</li>
-                </ul>
-                <p><strong>Click "View Images" in the sidebar to see images for this device.</strong></p>
-            </div>
-            """
+            # Build the popup HTML and tooltips column-wise from the precomputed IDs
+            device_ids = deterrents_df['device_id']
+            device_counts = device_ids.map(lambda device_id: image_counts.get((device_id, "device"), 0)).astype(str)
+            trail_counts = device_ids.map(lambda device_id: image_counts.get((device_id, "trail"), 0)).astype(str)
+            popups = (
+                '<div style="min-width: 200px; padding: 10px;"><h3>Deterrent ID: ' + device_ids +
+                '</h3><p>Location: ' + deterrents_df['lat'].map('{:.6f}'.format) + ', ' + deterrents_df['lng'].map('{:.6f}'.format) +
+                '</p><p>Available images:</p><ul><li>Device Images: ' + device_counts +
+                '</li><li>Trail Images: ' + trail_counts +
+                '</li></ul><p><strong>Click "View Images" in the sidebar to see images for this device.</strong></p></div>'
+            )
+            tooltips = 'Deterrent ID: ' + device_ids
             
-            # Create the popup with the HTML content
-            iframe = folium.IFrame(html=popup_html, width=250, height=200)
-            popup = folium.Popup(iframe, max_width=300)
-            
-            # Add marker with custom popup
-            folium.Marker(
-                [float(row['lat']), float(row['lng'])],
-                popup=popup,
-                tooltip=f"Deterrent ID: {device_id}",
-                icon=folium.Icon(color="red", icon="warning-sign")
-            ).add_to(m)
+            # One data array for all devices; the red warning markers are built client-side.
+            # Clustering is switched off so every device stays visible on its own, as before
+            deterrent_rows = list(zip(deterrents_df['lat'].to_numpy(dtype=float).tolist(), deterrents_df['lng'].to_numpy(dtype=float).tolist(), popups, tooltips))
+            FastMarkerCluster(data=deterrent_rows, callback=DETERRENT_CALLBACK_JS, name="Deterrent Devices",
+                              options={"disableClusteringAtZoom": 1}).add_to(m)
         
-        # Add existing custom markers with IDs displayed
-        for _, row in self.existing_markers.iterrows():
-            marker_id = row['id']
-            
-            # Create a custom icon with the ID number displayed
-            icon_html = f'''
-                <div style="
-                    background-color: #3186cc;
-                    color: white;
-                    border-radius: 50%;
-                    text-align: center;
-                    line-height: 30px;
-                    width: 30px;
-                    height: 30px;
-                    font-weight: bold;
-                    font-size: 12px;
-                    box-shadow: 0 0 10px rgba(0,0,0,0.3);">
-                    {marker_id}
-                </div>
-            '''
-            
-            # Create icon
-            icon = folium.DivIcon(html=icon_html)
-            
-            # Create popup with details
-            popup_html = f"""
-            <div>
-                <b>ID:</b> {marker_id}<br>
-                <b>Time:</b> {row['timestamp']}<br>
-                <b>Location:</b> {row['lat']:.6f}, {row['lng']:.6f}<br>
-            </div>
-            """
-            
-            # Add marker with custom icon and popup
-            folium.Marker(
-                location=[float(row['lat']), float(row['lng'])],
-                popup=folium.Popup(popup_html, max_width=300),
-                icon=icon
-            ).add_to(m)
+        # Add existing custom markers with IDs displayed; the markers are built
+        # client-side from a plain [lat, lng, id, timestamp] array
+        if not markers_df.empty:
+            # Style the ID labels once in a stylesheet rather than inline on every marker
+            m.get_root().header.add_child(folium.Element(PIN_ICON_CSS))
+            marker_data = markers_df[['lat', 'lng', 'id', 'timestamp']].fillna({'timestamp': ''}).astype({'lat': float, 'lng': float, 'id': str, 'timestamp': str}).values.tolist()
+            FastMarkerCluster(data=marker_data, callback=MARKER_CALLBACK_JS, name="Custom Markers").add_to(m)
         
         # Add existing polygons
-        for _, row in self.existing_polygons.iterrows():
-            polygon_id = row['polygon_id']
-            polygon_name = row['name']
-            
-            # Parse coordinates from JSON string if needed
-            if isinstance(row['coordinates'], str):
-                coordinates = json.loads(row['coordinates'])
-            else:
-                coordinates = row['coordinates']
-            
-            # Convert coordinates from [lng, lat] to [lat, lng] for folium
-            folium_coords = [[coord[1], coord[0]] for coord in coordinates]
+        if not polygons_df.empty:
+            # Build the popup HTML and tooltips column-wise; unnamed areas (NULL) show blank
+            polygon_names = polygons_df['name'].fillna('').astype(str)
+            popups = (
+                '<div><b>ID:</b> ' + polygons_df['polygon_id'].astype(str) +
+                '<br><b>Name:</b> ' + polygon_names +
+                '<br><b>Time:</b> ' + polygons_df['timestamp'].fillna('').astype(str) + '<br></div>'
+            )
+            tooltips = 'Area: ' + polygon_names
             
-            # Create popup with details
-            popup_html = f"""
-            <div>
-                <b>ID:</b> {polygon_id}<br>
-                <b>Name:</b> {polygon_name}<br>
-                <b>Time:</b> {row['timestamp']}<br>
-            </div>
-            """
-            
-            # Add polygon to map
-            folium.Polygon(
-                locations=folium_coords,
-                popup=folium.Popup(popup_html, max_width=300),
-                color='green',
-                fill=True,
-                fill_color='green',
-                fill_opacity=0.2,
-                tooltip=f"Area: {polygon_name}"
-            ).add_to(m)
+            # Stored rings are already GeoJSON [lng, lat], so all areas go out as one
+            # FeatureCollection layer with no coordinate flipping
+            features = [
+                {"type": "Feature", "geometry": {"type": "Polygon", "coordinates": [ring]},
+                 "properties": {"popup": popup_html, "tooltip": tooltip}}
+                for ring, popup_html, tooltip in zip(polygons_df['coordinates'], popups, tooltips) if ring
+            ]
+            if features:
+                folium.GeoJson(
+                    {"type": "FeatureCollection", "features": features},
+                    name="Areas",
+                    style_function=lambda feature: POLYGON_STYLE,
+                    popup=folium.GeoJsonPopup(fields=["popup"], labels=False, max_width=300),
+                    tooltip=folium.GeoJsonTooltip(fields=["tooltip"], labels=False)
+                ).add_to(m)
         
         # Add Draw plugin with polygon enabled
         draw = Draw(
@@ -373,22 +378,19 @@ class JapanDeterrentSystem:
 
     # In class JapanDeterrentSystem within japan_deterrents.py:
 
-    def display_device_images_in_sidebar(self):
+    def display_device_images_in_sidebar(self, deterrents_df=None, db_mtime=None):
         """Display images for a selected device in the sidebar with datetime filtering"""
         st.sidebar.header("Japan Deterrent Images")
+        db_mtime = self._db_mtime() if db_mtime is None else db_mtime
+        deterrents_df = self.load_deterrent_data(db_mtime) if deterrents_df is None else deterrents_df
 
         # Get device IDs for selection
         device_ids = []
-        if not self.deterrent_data.empty:
-            id_col = 'id' if 'id' in self.deterrent_data.columns else 'directory_name'
-            if id_col in self.deterrent_data.columns:
-                for raw_id in self.deterrent_data[id_col]:
-                    formatted_id = self.format_device_id(raw_id)
-                    if formatted_id not in device_ids:
-                         device_ids.append(formatted_id)
-                device_ids.sort()
+        if not deterrents_df.empty:
+            if 'device_id' in deterrents_df.columns:
+                device_ids = sorted(deterrents_df['device_id'].unique())
             else:
-                st.sidebar.warning(f"Could not find ID column ('{id_col}') in deterrent data.")
+                st.sidebar.warning("Could not find ID column ('device_id') in deterrent data.")
 
         device_options = ["None"] + device_ids
 
@@ -447,7 +449,7 @@ class JapanDeterrentSystem:
                         start_year = st.selectbox("Year", years, key="start_year", index=0)
                         start_month = st.selectbox("Month", range(1, 13), key="start_month", index=0)
                         # Improve day selection safety
-                        start_max_days = pd.Timestamp(start_year, start_month, 1).days_in_month
+                        start_max_days = monthrange(start_year, start_month)[1]
                         start_day_options = range(1, start_max_days + 1)
                         start_day_index = 0 # Default to 1st
                         start_day = st.selectbox("Day", start_day_options, key="start_day", index=start_day_index)
@@ -457,7 +459,7 @@ class JapanDeterrentSystem:
                         end_year = st.selectbox("Year", years, key="end_year", index=default_end_year_index)
                         end_month = st.selectbox("Month", range(1, 13), key="end_month", index=default_end_month_index)
                         # Improve day selection safety
-                        end_max_days = pd.Timestamp(end_year, end_month, 1).days_in_month
+                        end_max_days = monthrange(end_year, end_month)[1]
                         end_day_options = range(1, end_max_days + 1)
                         # Ensure default index is valid
                         safe_end_day_index = min(default_end_day_index, end_max_days - 1)
@@ -495,7 +497,7 @@ class JapanDeterrentSystem:
                     try:
                         # Use the full year/month range selected for the period
                         start_date = dt(period_start_year, period_start_month, 1, 0, 0)
-                        period_end_max_days = pd.Timestamp(period_end_year, period_end_month, 1).days_in_month
+                        period_end_max_days = monthrange(period_end_year, period_end_month)[1]
                         end_date = dt(period_end_year, period_end_month, period_end_max_days, 23, 59)
 
                         daily_time_filter = (daily_start_hour, daily_end_hour) # Set the filter tuple
@@ -517,20 +519,22 @@ class JapanDeterrentSystem:
             filter_end_date = end_date if use_filter else None
             filter_daily_time = daily_time_filter if use_filter and filter_mode == "Daily Time Period" else None
 
-            # Get image lists (potentially filtered) - runs on every interaction, but cached
-            device_image_list = self.get_image_files(selected_device, image_type="device", start_date=filter_start_date, end_date=filter_end_date, include_unsuccessful=include_unsuccessful, daily_time_filter=filter_daily_time)
-            trail_image_list = self.get_image_files(selected_device, image_type="trail", start_date=filter_start_date, end_date=filter_end_date, include_unsuccessful=include_unsuccessful, daily_time_filter=filter_daily_time)
+            # Count matching images (cached); only the visible page of each list is fetched below
+            image_filters = dict(start_date=filter_start_date, end_date=filter_end_date, include_unsuccessful=include_unsuccessful,
+                                 daily_time_filter=filter_daily_time, db_mtime=db_mtime)
+            device_image_total = self.get_image_total(selected_device, image_type="device", **image_filters)
+            trail_image_total = self.get_image_total(selected_device, image_type="trail", **image_filters)
 
             # --- Button Logic using Session State ---
             col1, col2 = st.sidebar.columns(2)
             with col1:
-                if st.button("Load Device Images", key="load_device_btn", help=f"{len(device_image_list)} device images available", use_container_width=True):
+                if st.button("Load Device Images", key="load_device_btn", help=f"{device_image_total} device images available", use_container_width=True):
                     st.session_state.show_device_images = True
                     st.session_state.show_trail_images = False
                     # Reset page number when button clicked
                     st.session_state.device_page = 1
             with col2:
-                 if st.button("Load Trail Images", key="load_trail_btn", help=f"{len(trail_image_list)} trail images available", use_container_width=True):
+                 if st.button("Load Trail Images", key="load_trail_btn", help=f"{trail_image_total} trail images available", use_container_width=True):
                     st.session_state.show_trail_images = True
                     st.session_state.show_device_images = False
                      # Reset page number when button clicked
@@ -538,92 +542,9 @@ class JapanDeterrentSystem:
             # --- End Button Logic ---
 
             # --- Display Logic using Session State ---
-            if st.session_state.get("show_device_images", False):
-                st.sidebar.subheader("Device Images")
-                if device_image_list:
-                    st.sidebar.write(f"Found {len(device_image_list)} device images")
-                    show_image_info = st.sidebar.checkbox("Show detailed image info", value=False, key="show_device_info_cb") # Unique key
-                    items_per_page = 5
-                    total_pages = (len(device_image_list) + items_per_page - 1) // items_per_page
-
-                    # Use session state for page number
-                    if 'device_page' not in st.session_state:
-                        st.session_state.device_page = 1
-
-                    page = 1 # Default if only one page
-                    if total_pages > 1:
-                        # Get page number from session state
-                        page = st.sidebar.number_input("Page", min_value=1, max_value=total_pages,
-                                                       key="device_page", # Use session state key here
-                                                       help="Select page number")
-                        st.sidebar.write(f"Page {st.session_state.device_page} of {total_pages}")
-
-                    start_idx = (st.session_state.device_page - 1) * items_per_page # Use state variable
-                    end_idx = min(start_idx + items_per_page, len(device_image_list))
-
-                    for img_data in device_image_list[start_idx:end_idx]:
-                        img_path = img_data['image_path']; filename = img_data['filename']
-                        caption = filename
-                        if show_image_info and img_data.get('timestamp'): # Use .get for safety
-                            try: img_date = dt.fromisoformat(img_data['timestamp']); date_info = img_date.strftime("%Y-%m-%d %H:%M"); caption = f"{filename}\nDate: {date_info}"
-                            except (ValueError, TypeError): pass
-                        if os.path.exists(img_path):
-                             st.sidebar.image(img_path, caption=caption, use_container_width=True)
-                        else:
-                             st.sidebar.warning(f"Img not found: {img_path}") # Shorter warning
-                else:
-                    st.sidebar.info("No device images found with the current filters")
-
-            if st.session_state.get("show_trail_images", False):
-                st.sidebar.subheader("Trail Images")
-                if trail_image_list:
-                    st.sidebar.write(f"Found {len(trail_image_list)} trail images")
-                    show_image_info = st.sidebar.checkbox("Show detailed image info", value=False, key="show_trail_info_cb") # Unique key
-                    items_per_page = 5
-                    total_pages = (len(trail_image_list) + items_per_page - 1) // items_per_page
-
-                    # Use session state for page number
-                    if 'trail_page' not in st.session_state:
-                        st.session_state.trail_page = 1
-
-                    page = 1 # Default if only one page
-                    if total_pages > 1:
-                         # Get page number from session state
-                        page = st.sidebar.number_input("Page", min_value=1, max_value=total_pages,
-                                                       key="trail_page", # Use session state key
-                                                       help="Select page number")
-                        st.sidebar.write(f"Page {st.session_state.trail_page} of {total_pages}")
-
-                    start_idx = (st.session_state.trail_page - 1) * items_per_page # Use state variable
-                    end_idx = min(start_idx + items_per_page, len(trail_image_list))
-
-                    # Use .get() for safer dictionary access
-                    successful_images = [img for img in trail_image_list[start_idx:end_idx] if img.get('parsed_successfully', False)]
-                    unsuccessful_images = [img for img in trail_image_list[start_idx:end_idx] if not img.get('parsed_successfully', False)]
-
-                    if successful_images:
-                        for img_data in successful_images:
-                            img_path = img_data['image_path']; filename = img_data['filename']
-                            caption = filename
-                            if show_image_info and img_data.get('timestamp'):
-                                try: img_date = dt.fromisoformat(img_data['timestamp']); date_info = img_date.strftime("%Y-%m-%d %H:%M"); caption = f"{filename}\nDate: {date_info}"
-                                except (ValueError, TypeError): pass
-                            if os.path.exists(img_path):
-                                st.sidebar.image(img_path, caption=caption, use_container_width=True)
-                            else:
-                                st.sidebar.warning(f"Img not found: {img_path}")
-
-                    if unsuccessful_images:
-                        st.sidebar.markdown("---"); st.sidebar.warning("Images with unsuccessful parsing:")
-                        for img_data in unsuccessful_images:
-                            img_path = img_data['image_path']; filename = img_data['filename']
-                            if os.path.exists(img_path):
-                                st.sidebar.image(img_path, caption=filename, use_container_width=True)
-                            else:
-                                st.sidebar.warning(f"Img not found: {img_path}")
-
-                else:
-                    st.sidebar.info("No trail images found with the current filters")
+            for image_type, image_total in (("device", device_image_total), ("trail", trail_image_total)):
+                if st.session_state.get(f"show_{image_type}_images", False):
+                    self._render_image_page(selected_device, image_type, image_total, image_filters)
              # --- End Display Logic ---
 
         else:
@@ -635,38 +556,98 @@ class JapanDeterrentSystem:
     # display_japan_deterrent_section and other methods remain the same...
     # ...
 
+    def _render_image_page(self, device_id, image_type, image_total, image_filters):
+        """Show one page of device or trail thumbnails in the sidebar, querying only that page"""
+        st.sidebar.subheader(f"{image_type.title()} Images")
+        if not image_total:
+            st.sidebar.info(f"No {image_type} images found with the current filters")
+            return
+        st.sidebar.write(f"Found {image_total} {image_type} images")
+        show_image_info = st.sidebar.checkbox("Show detailed image info", value=False, key=f"show_{image_type}_info_cb") # Unique key
+        items_per_page = 5
+        total_pages = (image_total + items_per_page - 1) // items_per_page
+
+        # Use session state for page number
+        page_key = f"{image_type}_page"
+        if page_key not in st.session_state:
+            st.session_state[page_key] = 1
+        if total_pages > 1:
+            st.sidebar.number_input("Page", min_value=1, max_value=total_pages, key=page_key, help="Select page number")
+            st.sidebar.write(f"Page {st.session_state[page_key]} of {total_pages}")
+
+        start_idx = (st.session_state[page_key] - 1) * items_per_page
+        page_images = self.get_image_files(device_id, image_type=image_type, limit=items_per_page, offset=start_idx, **image_filters)
+
+        # Trail images whose timestamp couldn't be parsed are listed separately, without dates
+        if image_type == "trail":
+            parsed_images = [img for img in page_images if img.get('parsed_successfully', False)]
+            unparsed_images = [img for img in page_images if not img.get('parsed_successfully', False)]
+        else:
+            parsed_images, unparsed_images = page_images, []
+        self._render_thumbnails(parsed_images, show_image_info)
+        if unparsed_images:
+            st.sidebar.markdown("---"); st.sidebar.warning("Images with unsuccessful parsing:")
+            self._render_thumbnails(unparsed_images, show_image_info=False)
+
+    def _render_thumbnails(self, images, show_image_info):
+        for img_data in images:
+            img_path = img_data['image_path']; filename = img_data['filename']
+            caption = f"{filename}\nDate: {img_data['date_info']}" if show_image_info and img_data.get('date_info') else filename
+            try: mtime = os.path.getmtime(img_path) # one stat both checks existence and keys the thumbnail cache
+            except OSError: st.sidebar.warning(f"Img not found: {img_path}")
+            else: st.sidebar.image(self.get_thumbnail(img_path, mtime), caption=caption, use_container_width=True)
+
     def display_japan_deterrent_section(self):
         """Display the Japan Deterrent System section in the Streamlit app."""
         # Add a title
         st.title("Interactive Bear Deterrent Mapping System")
         
+        # Load the data once per run (served from cache unless the database changed)
+        # and share it between the map and the tables. The fingerprint is taken once so
+        # the frames, the map and its HTML are all keyed to the same database version
+        db_mtime = self._db_mtime()
+        markers_df = self.load_existing_data(db_mtime)
+        polygons_df = self.load_polygon_data(db_mtime)
+        deterrents_df = self.load_deterrent_data(db_mtime)
+
         # Create tabs for different functionality
         tab1, tab2 = st.tabs(["Markers", "Areas"])
         
         with tab1:
             # Display the map with a hint about layer selection
             st.subheader("Deterrent Devices Map")
-            st.write("Use the marker tool (in the top-left) to place markers, then click 'Save New Markers' to save them.")
+            st.write("Turn on drawing mode and use the marker tool (in the top-left) to place markers, then click 'Save New Markers & Areas' to save them.")
             st.write("Each blue marker shows its ID number for easy identification.")
             st.info("👉 Look for the layer control in the top-right corner of the map to switch between different Japanese maps.")
 
-            # Create the map
-            m = self.create_map()
-            map_data = st_folium(m, width=1000, height=500, key="folium_map")
+            # Create the map; drawings are only sent back to Python in drawing mode,
+            # otherwise the map is embedded as static HTML with no round-trip
+            drawing_mode = st.toggle("Drawing mode", key="drawing_mode", help="Turn on to place markers or draw areas and save them.")
+            m = self.create_map(markers_df, deterrents_df, polygons_df, db_mtime)
+            if drawing_mode:
+                # Only the interactive component needs streamlit_folium, so import it on first use
+                from streamlit_folium import st_folium
+                map_data = st_folium(m, width=1000, height=500, key="folium_map",
+                                     returned_objects=["all_drawings"]) # the save form is the only reader
+            else:
+                map_data = None
+                components.html(self._render_map_html(m, db_mtime), height=500)
             
             # Display images in sidebar
-            self.display_device_images_in_sidebar()
+            self.display_device_images_in_sidebar(deterrents_df, db_mtime)
 
             # Add buttons for saving and deleting all markers
             col1, col2 = st.columns([1, 1])
             with col1:
                 if st.button("Save New Markers & Areas", key="save_markers", use_container_width=True):
-                    if map_data and 'all_drawings' in map_data and map_data['all_drawings']:
+                    if not drawing_mode:
+                        st.warning("Turn on drawing mode, then place markers or draw areas before saving.")
+                    elif map_data and 'all_drawings' in map_data and map_data['all_drawings']:
                         # Get all drawings
                         drawings = map_data['all_drawings']
                         
                         # Save all markers and polygons
-                        saved_points, saved_polygons = self.save_coordinates_from_geojson(drawings)
+                        saved_points, saved_polygons = self.save_coordinates_from_geojson(drawings, markers_df, polygons_df)
                         
                         # Show success message for markers
                         if saved_points:
@@ -702,144 +683,148 @@ class JapanDeterrentSystem:
 
             with col2:
                 if st.button("Delete All Markers", key="delete_all", use_container_width=True):
-                    # Confirm deletion
-                    if 'confirm_delete_all' not in st.session_state:
-                        st.session_state.confirm_delete_all = True
-                        st.warning("Are you sure you want to delete ALL markers? Click the button again to confirm.")
-                    else:
-                        # User confirmed, delete all markers
-                        if self.delete_all_markers():
-                            st.success("All markers have been deleted.")
-                            # Reset confirmation state
-                            st.session_state.confirm_delete_all = False
+                    st.session_state.confirm_delete_all = True
+
+                # Confirm deletion in a form so the choice is submitted in a single rerun
+                if st.session_state.get('confirm_delete_all'):
+                    with st.form("confirm_delete_all_form"):
+                        st.warning("Are you sure you want to delete ALL markers?")
+                        confirm_col, cancel_col = st.columns(2)
+                        confirmed = confirm_col.form_submit_button("Delete", type="primary", use_container_width=True)
+                        cancelled = cancel_col.form_submit_button("Cancel", use_container_width=True)
+                    if confirmed or cancelled:
+                        # Reset confirmation state
+                        st.session_state.confirm_delete_all = False
+                        if cancelled:
+                            st.rerun()
+                        elif self.delete_all_markers():
                             # Rerun to update the map
                             st.rerun()
                         else:
                             st.error("Error deleting markers.")
 
-            # Create an interactive table with delete buttons
-            st.subheader("Manage Markers")
-            current_markers = self.load_existing_data()  # Fresh load
-
-            if not current_markers.empty:
-                # Add a counter for formatting
-                row_count = len(current_markers)
-                
-                # Create multiple columns for better layout
-                col_id, col_coords, col_time, col_delete = st.columns([1, 2, 2, 1])
-                
-                # Headers
-                with col_id:
-                    st.write("**ID**")
-                with col_coords:
-                    st.write("**Location**")
-                with col_time:
-                    st.write("**Timestamp**")
-                with col_delete:
-                    st.write("**Action**")
-                
-                # Draw a separator line
-                st.markdown("---")
-                
-                # Display each marker in a row with a delete button
-                for index, row in current_markers.iterrows():
-                    cols = st.columns([1, 2, 2, 1])
-                    
-                    with cols[0]:
-                        st.write(f"{row['id']}")
-                    with cols[1]:
-                        st.write(f"{row['lat']:.6f}, {row['lng']:.6f}")
-                    with cols[2]:
-                        st.write(f"{row['timestamp']}")
-                    with cols[3]:
-                        # Each row gets its own delete button
-                        if st.button("Delete", key=f"delete_{row['id']}"):
-                            if self.delete_marker(row['id']):
-                                st.success(f"Marker {row['id']} deleted")
-                                # Force page refresh to update the map
-                                st.rerun()
-                            else:
-                                st.error(f"Failed to delete marker {row['id']}")
-            else:
-                st.info("No custom markers have been added yet.")
+            # Manage markers in an isolated fragment
+            self._render_markers_table(markers_df)
 
             # Display existing deterrent devices
             st.subheader("Existing Deterrent Devices")
-            st.dataframe(self.deterrent_data)
+            st.dataframe(deterrents_df)
         
         with tab2:
             # Areas tab
-            st.subheader("Areas Management")
+            self._render_polygons_table(polygons_df)
+
+    def _prep_display(self, markers_df):
+        """Add display columns to the markers frame in one vectorized pass"""
+        return markers_df.assign(
+            location=markers_df['lat'].map('{:.6f}'.format) + ', ' + markers_df['lng'].map('{:.6f}'.format),
+            id_str=markers_df['id'].astype(str),
+        )
+
+    @st.fragment
+    def _render_markers_table(self, current_markers):
+        """Render the marker management table; reruns only this fragment on interaction."""
+        # Editable table; ticking the delete column marks markers for deletion
+        st.subheader("Manage Markers")
+
+        if not current_markers.empty:
+            st.caption("Tick the markers to remove, then click 'Apply Deletions'.")
+            display_markers = self._prep_display(current_markers)
+            edited_markers = st.data_editor(
+                display_markers[['id_str', 'location', 'timestamp']].assign(delete=False),
+                disabled=['id_str', 'location', 'timestamp'],
+                hide_index=True,
+                use_container_width=True,
+                key="markers_editor",
+                column_config={
+                    'id_str': st.column_config.TextColumn("ID"),
+                    'location': st.column_config.TextColumn("Location"),
+                    'timestamp': st.column_config.TextColumn("Timestamp"),
+                    'delete': st.column_config.CheckboxColumn("Delete"),
+                }
+            )
+
+            # Ticked rows are deleted from the database in one batch
+            if st.button("Apply Deletions", key="apply_marker_deletions"):
+                ids_to_drop = edited_markers.loc[edited_markers['delete'], 'id_str'].tolist()
+                if not ids_to_drop:
+                    st.info("No markers selected for deletion.")
+                elif not self.delete_markers(ids_to_drop):
+                    st.error(f"Failed to delete marker(s): {', '.join(ids_to_drop)}")
+                else:
+                    # Drop the editor state so the ticks are not replayed, then refresh the map
+                    del st.session_state["markers_editor"]
+                    st.rerun()
+        else:
+            st.info("No custom markers have been added yet.")
+
+    @st.fragment
+    def _render_polygons_table(self, polygon_data):
+        """Render the area management table; reruns only this fragment on interaction."""
+        st.subheader("Areas Management")
+        
+        if not polygon_data.empty:
+            st.write(f"Found {len(polygon_data)} defined areas")
             
-            # Display existing polygons in a table
-            polygon_data = self.load_polygon_data()
+            st.caption("Edit names in place and tick the areas to remove, then click 'Apply Changes'.")
+            edited_polygons = st.data_editor(
+                polygon_data[['polygon_id', 'name', 'timestamp']].assign(delete=False),
+                disabled=['polygon_id', 'timestamp'],
+                hide_index=True,
+                use_container_width=True,
+                key="polygons_editor",
+                column_config={
+                    'polygon_id': st.column_config.TextColumn("ID"),
+                    'name': st.column_config.TextColumn("Name", required=True),
+                    'timestamp': st.column_config.TextColumn("Created"),
+                    'delete': st.column_config.CheckboxColumn("Delete"),
+                }
+            )
+
+            # Apply renames and deletions made in the editor
+            if st.button("Apply Changes", key="apply_polygon_changes"):
+                ids_to_drop = edited_polygons.loc[edited_polygons['delete'], 'polygon_id'].tolist()
+                renamed = edited_polygons[~edited_polygons['delete']].merge(polygon_data[['polygon_id', 'name']], on='polygon_id', suffixes=('', '_old'))
+                # Cleared and NULL names both compare as '' so an untouched unnamed area isn't "renamed" on every Apply
+                renamed = renamed.assign(name=renamed['name'].fillna(''), name_old=renamed['name_old'].fillna(''))
+                renamed = renamed[renamed['name'] != renamed['name_old']]
+                if not ids_to_drop and renamed.empty:
+                    st.info("No changes to apply.")
+                else:
+                    failed_ids = list(ids_to_drop) if ids_to_drop and not self.delete_polygons(ids_to_drop) else []
+                    for polygon_id, new_name in renamed[['polygon_id', 'name']].itertuples(index=False, name=None):
+                        if not self.update_polygon_name(polygon_id, new_name):
+                            failed_ids.append(polygon_id)
+                    if failed_ids:
+                        st.error(f"Failed to update area(s): {', '.join(failed_ids)}")
+                    else:
+                        # Drop the editor state so the edits are not replayed, then refresh the map
+                        del st.session_state["polygons_editor"]
+                        st.rerun()
             
-            if not polygon_data.empty:
-                st.write(f"Found {len(polygon_data)} defined areas")
-                
-                # Create a table for polygon management
-                cols = st.columns([1, 2, 2, 1])
-                
-                # Headers
-                with cols[0]:
-                    st.write("**ID**")
-                with cols[1]:
-                    st.write("**Name**")
-                with cols[2]:
-                    st.write("**Created**")
-                with cols[3]:
-                    st.write("**Action**")
-                
-                # Draw a separator line
-                st.markdown("---")
-                
-                # Display each polygon in a row with edit/delete buttons
-                for index, row in polygon_data.iterrows():
-                    col1, col2, col3, col4 = st.columns([1, 2, 2, 1])
-                    
-                    with col1:
-                        st.write(f"{row['polygon_id']}")
-                    with col2:
-                        # Allow editing the name with a text input
-                        new_name = st.text_input(
-                            "Name", 
-                            value=row['name'], 
-                            key=f"name_{row['polygon_id']}",
-                            label_visibility="collapsed"
-                        )
-                        # Update if name changed
-                        if new_name != row['name']:
-                            if self.update_polygon_name(row['polygon_id'], new_name):
-                                st.success(f"Name updated to '{new_name}'")
-                                st.rerun()
-                    with col3:
-                        st.write(f"{row['timestamp']}")
-                    with col4:
-                        if st.button("Delete", key=f"delete_poly_{row['polygon_id']}"):
-                            if self.delete_polygon(row['polygon_id']):
-                                st.success(f"Area {row['polygon_id']} deleted")
-                                st.rerun()
-                            else:
-                                st.error(f"Failed to delete area {row['polygon_id']}")
-                
-                # Add a button to delete all polygons
-                if st.button("Delete All Areas", key="delete_all_polys"):
-                    # Confirm deletion
-                    if 'confirm_delete_all_polygons' not in st.session_state:
-                        st.session_state.confirm_delete_all_polygons = True
-                        st.warning("Are you sure you want to delete ALL areas? Click the button again to confirm.")
+            # Add a button to delete all polygons
+            if st.button("Delete All Areas", key="delete_all_polys"):
+                st.session_state.confirm_delete_all_polygons = True
+
+            # Confirm deletion in a form so the choice is submitted in a single rerun
+            if st.session_state.get('confirm_delete_all_polygons'):
+                with st.form("confirm_delete_all_polygons_form"):
+                    st.warning("Are you sure you want to delete ALL areas?")
+                    confirm_col, cancel_col = st.columns(2)
+                    confirmed = confirm_col.form_submit_button("Delete", type="primary", use_container_width=True)
+                    cancelled = cancel_col.form_submit_button("Cancel", use_container_width=True)
+                if confirmed or cancelled:
+                    # Reset confirmation state
+                    st.session_state.confirm_delete_all_polygons = False
+                    if cancelled:
+                        st.rerun()
+                    elif self.delete_all_polygons():
+                        # Rerun to update the display
+                        st.rerun()
                     else:
-                        # User confirmed, delete all polygons
-                        if self.delete_all_polygons():
-                            st.success("All areas have been deleted.")
-                            # Reset confirmation state
-                            st.session_state.confirm_delete_all_polygons = False
-                            # Rerun to update the display
-                            st.rerun()
-                        else:
-                            st.error("Error deleting areas.")
-            else:
-                st.info("No areas have been defined yet. Use the polygon or rectangle drawing tools on the map to create areas.")
+                        st.error("Error deleting areas.")
+        else:
+            st.info("No areas have been defined yet. Use the polygon or rectangle drawing tools on the map to create areas.")
 
 # This can be used for testing the component independently
 if __name__ == "__main__":
@@ -1,6 +1,5 @@
 import streamlit as st
 import os
-import time
 
 # Set page configuration
 st.set_page_config(page_title="Wildlife Movement Analysis System", layout="wide")
@@ -27,16 +26,21 @@ else:
 # Clear the rest of the sidebar for the component's filters
 st.sidebar.markdown("---")
 
+@st.cache_resource
+def get_japan_system():
+    """Build the Japan system once per server process instead of on every rerun; it holds no data, only the DB handle"""
+    # Only import Japan module when needed
+    from japan_deterrents import JapanDeterrentSystem
+    return JapanDeterrentSystem()
+
 # Main content area
 st.title(selected_tab)
 
 # Only import and run the active component
 if st.session_state.active_tab == "japan":
-    # Only import Japan module when needed
     try:
-        from japan_deterrents import JapanDeterrentSystem
         # Initialize and display Japan system
-        japan_system = JapanDeterrentSystem()
+        japan_system = get_japan_system()
         japan_system.display_japan_deterrent_section()
     except Exception as e:
         st.error(f"Error loading Japan Deterrent System: {str(e)}")
@@ -45,36 +49,9 @@ else:  # Carpathian tab is active
     # Add loading indicator for Carpathian system
     with st.spinner("Loading Carpathian Bears Visualization..."):
         try:
-            # Display loading progress to manage user expectations
-            progress_placeholder = st.empty()
-            progress_bar = progress_placeholder.progress(0)
-            progress_text = st.empty()
-            
-            # First stage - module import
-            progress_text.text("Importing modules...")
-            for i in range(20):
-                time.sleep(0.02)
-                progress_bar.progress(i)
-            
             # Only import Carpathian module when needed - this is the key separation
             from carpathian_bears import display_carpathian_bears_section
             
-            # Second stage - data loading preparation
-            progress_text.text("Preparing data structures...")
-            for i in range(20, 40):
-                time.sleep(0.02)
-                progress_bar.progress(i)
-                
-            # Final stage - handing over to the component
-            progress_text.text("Initializing visualization...")
-            for i in range(40, 100):
-                time.sleep(0.01)
-                progress_bar.progress(i)
-                
-            # Clear the progress indicators
-            progress_placeholder.empty()
-            progress_text.empty()
-            
             # Display the Carpathian visualization
             display_carpathian_bears_section()
             
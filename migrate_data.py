@@ -75,6 +75,9 @@ def migrate_all_data():
     else:
          print("✗ Bears tracking data import step failed.")
 
+    # Fold the WAL into wildlife_data.db so the file is complete on its own
+    db.checkpoint()
+
     print("\nMigration complete! Database saved as wildlife_data.db")
     print("\nYou can now update your application to use the database.")
 
@@ -3,22 +3,237 @@ import sqlite3
 import pandas as pd
 import os
 import json
+import re
 from datetime import datetime
 import shutil
+import time
 import numpy as np
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from operator import itemgetter
 from pyproj import Transformer
 
+# File extensions indexed as images
+_IMG_EXTS = frozenset({'.jpg', '.jpeg', '.png'})
+# One statement string for every image_metadata insert so sqlite3 reuses the prepared statement
+_IMAGE_INSERT_SQL = "INSERT INTO image_metadata (device_id, image_path, image_type, filename, timestamp, parsed_successfully, hour) VALUES (?, ?, ?, ?, ?, ?, ?)"
+_IMAGE_BATCH_SIZE = 1000
+# Secondary indexes on image_metadata; a full reindex drops them and rebuilds them once the rows are in
+# idx_image_device_ts serves the per-device lookups: equality columns first, then the timestamp range/sort
+_IMAGE_INDEXES = {
+    'idx_image_device_ts': 'image_metadata(device_id, image_type, parsed_successfully, timestamp)',
+    'idx_image_timestamp': 'image_metadata(timestamp)',
+    'idx_image_device_hour': 'image_metadata(device_id, hour)',
+}
+# Indexes superseded by idx_image_device_ts, dropped from existing databases
+_OBSOLETE_IMAGE_INDEXES = ('idx_image_device', 'idx_image_device_type')
+
+@lru_cache(maxsize=None)
+def _get_transformer():
+    """EPSG:3844 (Stereo 70) to WGS84 transformer, built once per process"""
+    return Transformer.from_crs("EPSG:3844", "EPSG:4326", always_xy=True)
+
+# Fixed-width 'YYYY.MM.DD.HHMM' filename token, and the characters stripped from device filename tokens
+_DATE_TOKEN_RE = re.compile(r'(\d{4})\.(\d{2})\.(\d{2})\.(\d{2})(\d{2})')
+_NON_DATE_CHARS_RE = re.compile(r'[^\d.]')
+
+@lru_cache(maxsize=4096)
+def _parse_date_token(date_str):
+    """ISO timestamp for a 'YYYY.MM.DD.HHMM' filename token; raises ValueError if it doesn't parse"""
+    # Fixed-width tokens are built from the regex groups; anything else falls back to strptime
+    match = _DATE_TOKEN_RE.fullmatch(date_str)
+    if match: return datetime(*map(int, match.groups())).isoformat()
+    return datetime.strptime(date_str, "%Y.%m.%d.%H%M").isoformat()
+
+# Per-bear, per-season summary behind get_seasonal_data, materialized by refresh_seasonal_stats
+_SEASONAL_STATS_QUERY = """
+    SELECT 
+        bear_id,
+        season,
+        sex,
+        age,
+        COUNT(*) as point_count,
+        AVG(x) as avg_x,
+        AVG(y) as avg_y,
+        MIN(x) as min_x,
+        MAX(x) as max_x,
+        MIN(y) as min_y,
+        MAX(y) as max_y,
+        MIN(lat) as min_lat,
+        MAX(lat) as max_lat,
+        MIN(lng) as min_lng,
+        MAX(lng) as max_lng,
+        COUNT(DISTINCT date(timestamp)) as day_count
+    FROM bears_tracking
+    WHERE bear_id IS NOT NULL
+    GROUP BY bear_id, season, sex, age
+"""
+
+# Tables created by initialize_db, run as one script; image_metadata's indexes follow the hour migration.
+# WAL lets the app keep reading while imports and saves write; the mode is stored in the database file
+_SCHEMA_SQL = """
+PRAGMA journal_mode = WAL;
+BEGIN;
+CREATE TABLE IF NOT EXISTS deterrent_devices (id TEXT PRIMARY KEY, directory_name TEXT, lat REAL, lng REAL);
+CREATE TABLE IF NOT EXISTS markers (id TEXT PRIMARY KEY, timestamp TEXT, lat REAL, lng REAL);
+CREATE TABLE IF NOT EXISTS polygons (polygon_id TEXT PRIMARY KEY, timestamp TEXT, name TEXT, coordinates TEXT);
+CREATE TABLE IF NOT EXISTS image_metadata (id INTEGER PRIMARY KEY AUTOINCREMENT, device_id TEXT, image_path TEXT, image_type TEXT, filename TEXT, timestamp TEXT, parsed_successfully BOOLEAN, hour INTEGER, FOREIGN KEY (device_id) REFERENCES deterrent_devices(id));
+
+CREATE TABLE IF NOT EXISTS bears_tracking (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    bear_id TEXT,
+    timestamp TEXT,
+    x REAL,
+    y REAL,
+    lat REAL,
+    lng REAL,
+    season_code TEXT,
+    season TEXT,
+    sex TEXT,
+    age TEXT,
+    is_daytime BOOLEAN
+);
+CREATE INDEX IF NOT EXISTS idx_bears_bear_ts ON bears_tracking(bear_id, timestamp);
+
+CREATE TABLE IF NOT EXISTS bears_mcp (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, 
+    bear_id TEXT,
+    area REAL,
+    sex TEXT,
+    age TEXT,
+    num_gmu INTEGER,
+    stage TEXT
+);
+
+CREATE TABLE IF NOT EXISTS bears_core_area (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    bear_id TEXT,
+    sex TEXT,
+    age TEXT,
+    area REAL
+);
+
+CREATE TABLE IF NOT EXISTS bears_kde (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    bear_id TEXT,
+    area REAL,
+    sex TEXT,
+    age TEXT,
+    num_gmu INTEGER,
+    stage TEXT
+);
+
+CREATE TABLE IF NOT EXISTS bears_seasonal_mcp (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    bear_id TEXT,
+    area REAL,
+    season TEXT
+);
+
+CREATE TABLE IF NOT EXISTS bears_daily_displacement (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    bear_id TEXT,
+    x REAL,
+    y REAL,
+    lat REAL,
+    lng REAL,
+    date TEXT,
+    distance REAL,
+    season TEXT,
+    altitude REAL
+);
+COMMIT;
+"""
+
+# WAL keeps -wal/-shm sidecar files next to the database while it is open (they are git-ignored). Writes can sit
+# in the -wal file until a checkpoint, so migrations end with WildlifeDatabase.checkpoint() and the .db file
+# alone is complete again; close the app or checkpoint before copying or committing wildlife_data.db.
+@lru_cache(maxsize=None)
+def _enable_wal(db_path):
+    """Switch a database file to WAL once per process, so files created before initialize_db set it convert too"""
+    conn = sqlite3.connect(db_path)
+    try: conn.execute("PRAGMA journal_mode = WAL")
+    finally: conn.close()
+
+def _rebuild_seasonal_stats(cursor):
+    """Recreate bears_seasonal_stats from bears_tracking on the caller's connection and transaction"""
+    cursor.execute("DROP TABLE IF EXISTS bears_seasonal_stats")
+    cursor.execute("CREATE TABLE bears_seasonal_stats AS " + _SEASONAL_STATS_QUERY)
+    cursor.execute("CREATE INDEX idx_seasonal_stats_bear ON bears_seasonal_stats(bear_id, season)")
+
+def _migrate_image_metadata(cursor):
+    """Add and backfill image_metadata.hour and create its current indexes; a no-op before the table exists"""
+    cursor.execute("PRAGMA table_info(image_metadata)"); columns = [col[1] for col in cursor.fetchall()]
+    if not columns: return
+    # hour is stored so the daily time filter compares a column instead of parsing every timestamp
+    if 'hour' not in columns:
+        cursor.execute("ALTER TABLE image_metadata ADD COLUMN hour INTEGER")
+        cursor.execute("UPDATE image_metadata SET hour = CAST(substr(timestamp, 12, 2) AS INTEGER) WHERE timestamp IS NOT NULL")
+    for index_name in _OBSOLETE_IMAGE_INDEXES: cursor.execute(f'DROP INDEX IF EXISTS {index_name}')
+    for index_name, index_target in _IMAGE_INDEXES.items(): cursor.execute(f'CREATE INDEX IF NOT EXISTS {index_name} ON {index_target}')
+
+def _drop_polygon_index(cursor):
+    """Remove the unused polygon R-tree and its sync triggers from databases that still have them"""
+    if cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'polygons_rtree'").fetchone() is None: return
+    cursor.execute('DROP TRIGGER IF EXISTS polygons_rtree_ai'); cursor.execute('DROP TRIGGER IF EXISTS polygons_rtree_ad')
+    cursor.execute('DROP TABLE polygons_rtree')
+
+@lru_cache(maxsize=None)
+def _migrate_schema(db_path):
+    """Bring an existing database file up to the current schema once per process; every step is idempotent"""
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor(); _migrate_image_metadata(cursor); _drop_polygon_index(cursor); conn.commit()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally: conn.close()
+
+def _list_dir(path):
+    """scandir listing of a folder, or the OSError raised while reading it"""
+    try:
+        with os.scandir(path) as it: return list(it)
+    except OSError as e: return e
+
+def _load_coordinates(value):
+    """Parsed polygon coordinates for a stored JSON string; None if it doesn't parse, non-strings pass through"""
+    if not isinstance(value, str): return value
+    try: return json.loads(value)
+    except json.JSONDecodeError: return None
+
 class WildlifeDatabase:
     def __init__(self, db_path="wildlife_data.db"):
         self.db_path = db_path
-        # Initialize the coordinate transformer
-        self.transformer = Transformer.from_crs("EPSG:3844", "EPSG:4326", always_xy=True)
+
+    def _connect(self):
+        """Open a connection with the per-connection PRAGMAs; WAL mode itself persists in the file"""
+        # A busy database raises here and isn't cached, so a later connection tries again
+        for prepare in (_enable_wal, _migrate_schema):
+            try: prepare(self.db_path)
+            except sqlite3.OperationalError: pass
+        conn = sqlite3.connect(self.db_path)
+        # NORMAL is durable under WAL, memory-mapped reads skip a copy through SQLite's page cache,
+        # and sorts/GROUP BYs keep their temporary b-trees in memory
+        conn.execute("PRAGMA synchronous = NORMAL"); conn.execute("PRAGMA mmap_size = 268435456"); conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+    def checkpoint(self):
+        """Copy everything in the WAL into the main database file and truncate the WAL"""
+        conn = None
+        try: conn = self._connect(); conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone(); return True
+        except sqlite3.Error as e: print(f"Error checkpointing {self.db_path}: {e}"); return False
+        finally:
+            if conn: conn.close()
+
+    @property
+    def transformer(self):
+        """Coordinate transformer, created on first use and shared by all instances"""
+        return _get_transformer()
 
     def get_distinct_values(self, table_name, column_name):
         """Get distinct values from a specific column in a table"""
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             query = f"SELECT DISTINCT {column_name} FROM {table_name} WHERE {column_name} IS NOT NULL"
             cursor = conn.cursor()
             cursor.execute(query)
@@ -34,7 +249,7 @@ class WildlifeDatabase:
         """Fix any issues with timestamps in the database"""
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             
             # Check for NULL timestamps
@@ -49,35 +264,30 @@ class WildlifeDatabase:
             if null_count > 0 and non_null_count == 0:
                 print("All timestamps are NULL. Creating artificial timestamps...")
                 
-                # Get the bears and their record counts
-                cursor.execute("SELECT bear_id, COUNT(*) FROM bears_tracking GROUP BY bear_id")
-                bear_counts = cursor.fetchall()
+                # Get every record grouped by bear in one query
+                cursor.execute("SELECT bear_id, id FROM bears_tracking ORDER BY bear_id, id")
                 
                 base_date = datetime(2018, 1, 1)  # Start with a reasonable date
-                updated_count = 0
+                updates = []
                 
-                for bear_id, count in bear_counts:
-                    print(f"Processing {count} records for bear {bear_id}...")
+                for bear_id, bear_rows in groupby(cursor.fetchall(), key=itemgetter(0)):
+                    record_ids = [record_id for _, record_id in bear_rows]
+                    print(f"Processing {len(record_ids)} records for bear {bear_id}...")
                     
-                    # Get all records for this bear
-                    cursor.execute("SELECT id FROM bears_tracking WHERE bear_id = ? ORDER BY id", (bear_id,))
-                    record_ids = [row[0] for row in cursor.fetchall()]
-                    
-                    # Create evenly spread timestamps
-                    for i, record_id in enumerate(record_ids):
-                        # Create a timestamp spaced 1 hour apart for each record
-                        timestamp = base_date + pd.Timedelta(hours=i)
-                        
-                        cursor.execute(
-                            "UPDATE bears_tracking SET timestamp = ? WHERE id = ?",
-                            (timestamp.isoformat(), record_id)
-                        )
-                        updated_count += 1
+                    # Rows without a bear_id never matched the per-bear lookup, so they are left as they are
+                    if bear_id is not None:
+                        # Create evenly spread timestamps, 1 hour apart, as one datetime64 array
+                        timestamps = (np.datetime64(base_date, 'h') + np.arange(len(record_ids))).astype('datetime64[s]').astype(str)
+                        updates.extend(zip(timestamps.tolist(), record_ids))
                     
                     # Advance base date by 6 months for the next bear
                     base_date = base_date + pd.Timedelta(days=180)
                 
-                # Commit changes
+                # Write all timestamps in one batch and commit once
+                cursor.executemany("UPDATE bears_tracking SET timestamp = ? WHERE id = ?", updates)
+                updated_count = len(updates)
+                # day_count in the seasonal summary depends on these timestamps
+                _rebuild_seasonal_stats(cursor)
                 conn.commit()
                 print(f"Created artificial timestamps for {updated_count} records.")
                 
@@ -94,97 +304,16 @@ class WildlifeDatabase:
             if conn: conn.close()
     
 
-    def initialize_db(self):
+    def initialize_db(self, rebuild_bears_tracking=False):
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
-            
-            # Create original tables
-            cursor.execute('CREATE TABLE IF NOT EXISTS deterrent_devices (id TEXT PRIMARY KEY, directory_name TEXT, lat REAL, lng REAL)')
-            cursor.execute('CREATE TABLE IF NOT EXISTS markers (id TEXT PRIMARY KEY, timestamp TEXT, lat REAL, lng REAL)')
-            cursor.execute('CREATE TABLE IF NOT EXISTS polygons (polygon_id TEXT PRIMARY KEY, timestamp TEXT, name TEXT, coordinates TEXT)')
-            cursor.execute('CREATE TABLE IF NOT EXISTS image_metadata (id INTEGER PRIMARY KEY AUTOINCREMENT, device_id TEXT, image_path TEXT, image_type TEXT, filename TEXT, timestamp TEXT, parsed_successfully BOOLEAN, FOREIGN KEY (device_id) REFERENCES deterrent_devices(id))')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_image_device ON image_metadata(device_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_image_timestamp ON image_metadata(timestamp)')
-            
-            # Create new tables for Carpathian bears data
-            # Use DROP TABLE to ensure we rebuild the table with the correct schema
-            cursor.execute("DROP TABLE IF EXISTS bears_tracking")
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS bears_tracking (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    bear_id TEXT,
-                    timestamp TEXT,
-                    x REAL,
-                    y REAL,
-                    lat REAL,
-                    lng REAL,
-                    season_code TEXT,
-                    season TEXT,
-                    sex TEXT,
-                    age TEXT,
-                    is_daytime BOOLEAN
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS bears_mcp (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT, 
-                    bear_id TEXT,
-                    area REAL,
-                    sex TEXT,
-                    age TEXT,
-                    num_gmu INTEGER,
-                    stage TEXT
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS bears_core_area (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    bear_id TEXT,
-                    sex TEXT,
-                    age TEXT,
-                    area REAL
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS bears_kde (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    bear_id TEXT,
-                    area REAL,
-                    sex TEXT,
-                    age TEXT,
-                    num_gmu INTEGER,
-                    stage TEXT
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS bears_seasonal_mcp (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    bear_id TEXT,
-                    area REAL,
-                    season TEXT
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS bears_daily_displacement (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    bear_id TEXT,
-                    x REAL,
-                    y REAL,
-                    lat REAL,
-                    lng REAL,
-                    date TEXT,
-                    distance REAL,
-                    season TEXT,
-                    altitude REAL
-                )
-            ''')
+            # bears_tracking is only dropped when its schema has to be rebuilt; the import that follows refills it
+            if rebuild_bears_tracking: cursor.execute("DROP TABLE IF EXISTS bears_tracking"); conn.commit()
+            # All tables are created by one script in one transaction
+            cursor.executescript(_SCHEMA_SQL)
+            _migrate_image_metadata(cursor)
             
             conn.commit()
         except Exception as e:
@@ -206,26 +335,22 @@ class WildlifeDatabase:
         except Exception as e: print(f"Error reading CSV {csv_path}: {e}"); return False
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path); cursor = conn.cursor()
+            conn = self._connect(); cursor = conn.cursor()
             print("Dropping deterrent_devices table (if exists)..."); cursor.execute("DROP TABLE IF EXISTS deterrent_devices")
             print("Creating deterrent_devices table..."); cursor.execute('''CREATE TABLE deterrent_devices (id TEXT PRIMARY KEY, directory_name TEXT, lat REAL, lng REAL)''')
             print("Table 'deterrent_devices' created.")
-            successful_inserts = 0; failed_inserts = 0
             print("Starting data insertion...")
-            for _, row in df.iterrows():
-                try:
-                    if 'Directory name' not in row or pd.isna(row['Directory name']) or 'lat' not in row or 'lng' not in row: failed_inserts += 1; continue
-                    directory_name_raw = str(row['Directory name']).strip(); id_cleaned = directory_name_raw
-                    if '.' in id_cleaned:
-                        try:
-                           id_float = float(id_cleaned)
-                           if id_float == int(id_float): id_cleaned = str(int(id_float))
-                        except ValueError: pass
-                    cursor.execute("INSERT INTO deterrent_devices (id, directory_name, lat, lng) VALUES (?, ?, ?, ?)", (id_cleaned, id_cleaned, row['lat'], row['lng']))
-                    successful_inserts += 1
-                except sqlite3.IntegrityError: print(f"Record with ID {id_cleaned} already exists (IntegrityError), skipping"); failed_inserts += 1
-                except Exception as e: print(f"Error inserting record for '{id_cleaned}': {e}"); failed_inserts += 1
-            print(f"Insertion loop finished: {successful_inserts} successful attempts, {failed_inserts} failed/skipped.")
+            rows = []
+            if {'Directory name', 'lat', 'lng'}.issubset(df.columns):
+                # Clean IDs column-wise: strip, and turn float-like names such as '3002.0' into '3002'
+                valid = df[df['Directory name'].notna()]; ids = valid['Directory name'].astype(str).str.strip()
+                as_float = pd.to_numeric(ids.where(ids.str.contains('.', regex=False)), errors='coerce')
+                int_like = as_float.notna() & (as_float == as_float.round()); ids[int_like] = as_float[int_like].astype('int64').astype(str)
+                rows = list(zip(ids.tolist(), ids.tolist(), valid['lat'].tolist(), valid['lng'].tolist()))
+            # One executemany in one transaction; OR IGNORE skips duplicate IDs instead of aborting the batch
+            cursor.executemany("INSERT OR IGNORE INTO deterrent_devices (id, directory_name, lat, lng) VALUES (?, ?, ?, ?)", rows)
+            successful_inserts = max(cursor.rowcount, 0); failed_inserts = num_csv_records - successful_inserts
+            print(f"Insertion finished: {successful_inserts} inserted, {failed_inserts} failed/skipped (missing IDs or duplicates).")
             print("Attempting to commit insertions..."); conn.commit(); print("Commit successful.")
             cursor.execute("SELECT COUNT(*) FROM deterrent_devices"); post_commit_count = cursor.fetchone()[0]
             print(f"Verification Query: Found {post_commit_count} records in table immediately after commit.")
@@ -235,14 +360,18 @@ class WildlifeDatabase:
         finally:
             if conn: print("Closing database connection for import."); conn.close()
 
-    def get_deterrent_devices(self):
-        conn = None
+    def _read_frame(self, query, params=(), dtype=None):
+        """Run a SELECT and build the DataFrame straight from the fetched rows, bypassing pd.read_sql"""
+        conn = self._connect()
         try:
-            conn = sqlite3.connect(self.db_path)
-            df = pd.read_sql("SELECT * FROM deterrent_devices ORDER BY id", conn, dtype={'id': str, 'directory_name': str})
+            cursor = conn.execute(query, params); columns = [col[0] for col in cursor.description]
+            df = pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+        finally: conn.close()
+        return df.astype(dtype) if dtype else df
+
+    def get_deterrent_devices(self):
+        try: df = self._read_frame("SELECT * FROM deterrent_devices ORDER BY id", dtype={'id': str, 'directory_name': str})
         except Exception as e: print(f"!!! Error reading deterrent devices from DB: {e}"); df = pd.DataFrame()
-        finally:
-             if conn: conn.close()
         return df
 
     # --- Markers Methods ---
@@ -252,18 +381,14 @@ class WildlifeDatabase:
         except Exception as e: print(f"Error reading markers CSV {csv_path}: {e}"); return False
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path); cursor = conn.cursor()
+            conn = self._connect(); cursor = conn.cursor()
             print(f"Importing markers from {csv_path}. Existing markers will be kept (duplicates skipped).")
-            inserted_count = 0; skipped_count = 0
-            for _, row in df.iterrows():
-                 marker_id = str(row['id']) if pd.notna(row['id']) else None;
-                 if not marker_id: skipped_count += 1; continue
-                 try:
-                    if 'timestamp' not in row or 'lat' not in row or 'lng' not in row: skipped_count += 1; continue
-                    cursor.execute("INSERT OR IGNORE INTO markers (id, timestamp, lat, lng) VALUES (?, ?, ?, ?)",(marker_id, row['timestamp'], row['lat'], row['lng']))
-                    if cursor.rowcount > 0: inserted_count += 1
-                    else: skipped_count += 1
-                 except Exception as e: print(f"Error inserting marker {marker_id}: {e}"); skipped_count += 1
+            rows = []
+            if {'id', 'timestamp', 'lat', 'lng'}.issubset(df.columns):
+                valid = df[df['id'].notna()]
+                rows = list(zip(valid['id'].astype(str).tolist(), valid['timestamp'].tolist(), valid['lat'].tolist(), valid['lng'].tolist()))
+            cursor.executemany("INSERT OR IGNORE INTO markers (id, timestamp, lat, lng) VALUES (?, ?, ?, ?)", rows)
+            inserted_count = max(cursor.rowcount, 0); skipped_count = len(df) - inserted_count
             conn.commit()
             print(f"Attempted marker import: {inserted_count} new markers inserted, {skipped_count} skipped (duplicates/errors).")
             return True
@@ -272,53 +397,69 @@ class WildlifeDatabase:
             if conn: conn.close()
     
     def get_markers(self):
-        conn = None
-        try: conn = sqlite3.connect(self.db_path); df = pd.read_sql("SELECT * FROM markers ORDER BY id", conn, dtype={'id': str})
+        try: df = self._read_frame("SELECT * FROM markers ORDER BY id", dtype={'id': str})
         except Exception as e: print(f"!!! Error reading markers from DB: {e}"); df = pd.DataFrame()
-        finally:
-             if conn: conn.close()
         return df
         
     def save_marker(self, marker_id, lat, lng):
+        return self.save_markers([(marker_id, lat, lng)])
+
+    def save_markers(self, markers):
+        """Insert (marker_id, lat, lng) rows in a single transaction"""
+        return self.save_drawings(markers, [])
+
+    def save_drawings(self, markers, polygons):
+        """Insert (marker_id, lat, lng) and (polygon_id, name, coordinates) rows in one transaction"""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        marker_rows = [(str(marker_id), timestamp, lat, lng) for marker_id, lat, lng in markers]
+        polygon_rows = [(str(polygon_id), timestamp, str(name), coordinates if isinstance(coordinates, str) else json.dumps(coordinates, separators=(',', ':'))) for polygon_id, name, coordinates in polygons]
+        if not marker_rows and not polygon_rows: return False
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path); timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S"); marker_id_str = str(marker_id)
-            conn.execute("INSERT INTO markers (id, timestamp, lat, lng) VALUES (?, ?, ?, ?)",(marker_id_str, timestamp, lat, lng)); conn.commit(); return True
+            conn = self._connect()
+            if marker_rows: conn.executemany("INSERT INTO markers (id, timestamp, lat, lng) VALUES (?, ?, ?, ?)", marker_rows)
+            if polygon_rows: conn.executemany("INSERT INTO polygons (polygon_id, timestamp, name, coordinates) VALUES (?, ?, ?, ?)", polygon_rows)
+            conn.commit(); return True
         except sqlite3.IntegrityError: return False
-        except Exception as e: print(f"Error saving marker {marker_id_str}: {e}"); return False
+        except Exception as e: print(f"Error saving drawings {[row[0] for row in marker_rows + polygon_rows]}: {e}"); return False
         finally:
             if conn: conn.close()
             
     def delete_marker(self, marker_id):
+        return self.delete_markers([marker_id])
+
+    def delete_markers(self, marker_ids):
+        marker_id_strs = [str(marker_id) for marker_id in marker_ids]
+        if not marker_id_strs: return False
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path); cursor = conn.cursor(); marker_id_str = str(marker_id)
-            cursor.execute("DELETE FROM markers WHERE id = ?", (marker_id_str,)); deleted_rows = cursor.rowcount; conn.commit(); return deleted_rows > 0
-        except Exception as e: print(f"Error deleting marker {marker_id}: {e}"); return False
+            conn = self._connect(); cursor = conn.cursor(); placeholders = ",".join("?" * len(marker_id_strs))
+            cursor.execute(f"DELETE FROM markers WHERE id IN ({placeholders})", marker_id_strs); deleted_rows = cursor.rowcount
+            if deleted_rows > 0: conn.commit()
+            return deleted_rows > 0
+        except Exception as e: print(f"Error deleting markers {marker_id_strs}: {e}"); return False
         finally:
             if conn: conn.close()
             
     def delete_all_markers(self):
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path); cursor = conn.cursor()
+            conn = self._connect(); cursor = conn.cursor()
             cursor.execute("DELETE FROM markers"); deleted_rows = cursor.rowcount; conn.commit(); print(f"Deleted {deleted_rows} markers."); return True
         except Exception as e: print(f"Error deleting all markers: {e}"); return False
         finally:
             if conn: conn.close()
             
     def get_next_marker_id(self):
-        conn = None; ids = []
+        conn = None; max_id = 0
         try:
-            conn = sqlite3.connect(self.db_path); cursor = conn.cursor(); cursor.execute("SELECT id FROM markers"); ids = cursor.fetchall()
+            # Only all-digit IDs count; the max is computed in SQLite rather than by pulling every ID into Python
+            conn = self._connect(); cursor = conn.cursor()
+            cursor.execute("SELECT COALESCE(MAX(CAST(id AS INTEGER)), 0) FROM markers WHERE id <> '' AND id NOT GLOB '*[^0-9]*'"); max_id = cursor.fetchone()[0]
         except Exception as e: print(f"Error getting next marker ID: {e}")
         finally:
             if conn: conn.close()
-        numeric_ids = [];
-        for id_tuple in ids:
-            try: numeric_ids.append(int(id_tuple[0]))
-            except (ValueError, TypeError, IndexError): pass
-        return max(numeric_ids, default=0) + 1
+        return max_id + 1
 
     # --- Polygons Methods ---
     def import_polygons(self, csv_path="data/areas/user_drawn_area_cities.csv"):
@@ -327,18 +468,14 @@ class WildlifeDatabase:
         except Exception as e: print(f"Error reading polygons CSV {csv_path}: {e}"); return False
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path); cursor = conn.cursor()
+            conn = self._connect(); cursor = conn.cursor()
             print(f"Importing polygons from {csv_path}. Existing polygons will be kept (duplicates skipped).")
-            inserted_count = 0; skipped_count = 0
-            for _, row in df.iterrows():
-                 polygon_id = str(row['polygon_id']) if pd.notna(row['polygon_id']) else None
-                 if not polygon_id: skipped_count += 1; continue
-                 try:
-                     if 'timestamp' not in row or 'name' not in row or 'coordinates' not in row: skipped_count += 1; continue
-                     cursor.execute("INSERT OR IGNORE INTO polygons (polygon_id, timestamp, name, coordinates) VALUES (?, ?, ?, ?)",(polygon_id, row['timestamp'], row['name'], row['coordinates']))
-                     if cursor.rowcount > 0: inserted_count += 1
-                     else: skipped_count += 1
-                 except Exception as e: print(f"Error inserting polygon {polygon_id}: {e}"); skipped_count += 1
+            rows = []
+            if {'polygon_id', 'timestamp', 'name', 'coordinates'}.issubset(df.columns):
+                valid = df[df['polygon_id'].notna()]
+                rows = list(zip(valid['polygon_id'].astype(str).tolist(), valid['timestamp'].tolist(), valid['name'].tolist(), valid['coordinates'].tolist()))
+            cursor.executemany("INSERT OR IGNORE INTO polygons (polygon_id, timestamp, name, coordinates) VALUES (?, ?, ?, ?)", rows)
+            inserted_count = max(cursor.rowcount, 0); skipped_count = len(df) - inserted_count
             conn.commit()
             print(f"Attempted polygon import: {inserted_count} new polygons inserted, {skipped_count} skipped (duplicates/errors).")
             return True
@@ -347,78 +484,72 @@ class WildlifeDatabase:
              if conn: conn.close()
              
     def get_polygons(self):
-        conn = None
-        try: conn = sqlite3.connect(self.db_path); df = pd.read_sql("SELECT * FROM polygons ORDER BY polygon_id", conn, dtype={'polygon_id': str, 'name': str})
+        try: df = self._read_frame("SELECT * FROM polygons ORDER BY polygon_id", dtype={'polygon_id': str, 'name': str})
         except Exception as e: print(f"!!! Error reading polygons from DB: {e}"); df = pd.DataFrame()
-        finally:
-             if conn: conn.close()
-        if not df.empty and 'coordinates' in df.columns:
-            def safe_json_loads(x):
-                if isinstance(x, str):
-                    try: return json.loads(x)
-                    except json.JSONDecodeError: return None
-                return x
-            df['coordinates'] = df['coordinates'].apply(safe_json_loads)
+        if not df.empty and 'coordinates' in df.columns: df['coordinates'] = [_load_coordinates(x) for x in df['coordinates'].tolist()]
         return df
         
     def save_polygon(self, polygon_id, name, coordinates):
-        conn = None
-        try:
-            conn = sqlite3.connect(self.db_path); timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S"); polygon_id_str = str(polygon_id); name_str = str(name)
-            if not isinstance(coordinates, str): coordinates_str = json.dumps(coordinates)
-            else: coordinates_str = coordinates
-            conn.execute("INSERT INTO polygons (polygon_id, timestamp, name, coordinates) VALUES (?, ?, ?, ?)",(polygon_id_str, timestamp, name_str, coordinates_str)); conn.commit(); return True
-        except sqlite3.IntegrityError: return False
-        except Exception as e: print(f"Error saving polygon {polygon_id_str}: {e}"); return False
-        finally:
-            if conn: conn.close()
+        return self.save_polygons([(polygon_id, name, coordinates)])
+
+    def save_polygons(self, polygons):
+        """Insert (polygon_id, name, coordinates) rows in a single transaction"""
+        return self.save_drawings([], polygons)
             
     def update_polygon_name(self, polygon_id, new_name):
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path); cursor = conn.cursor(); polygon_id_str = str(polygon_id); new_name_str = str(new_name)
-            cursor.execute("UPDATE polygons SET name = ? WHERE polygon_id = ?", (new_name_str, polygon_id_str)); updated_rows = cursor.rowcount; conn.commit(); return updated_rows > 0
+            # A blank or missing name is stored as NULL rather than the string "None"/"nan"
+            new_name_str = None if new_name is None or pd.isna(new_name) or not str(new_name).strip() else str(new_name)
+            conn = self._connect(); cursor = conn.cursor(); polygon_id_str = str(polygon_id)
+            # Only rows whose name actually changes are written; an unchanged name is still a success
+            cursor.execute("UPDATE polygons SET name = ? WHERE polygon_id = ? AND name IS NOT ?", (new_name_str, polygon_id_str, new_name_str)); updated_rows = cursor.rowcount
+            if updated_rows > 0: conn.commit(); return True
+            cursor.execute("SELECT 1 FROM polygons WHERE polygon_id = ?", (polygon_id_str,)); return cursor.fetchone() is not None
         except Exception as e: print(f"Error updating polygon name for {polygon_id}: {e}"); return False
         finally:
             if conn: conn.close()
             
     def delete_polygon(self, polygon_id):
+        return self.delete_polygons([polygon_id])
+
+    def delete_polygons(self, polygon_ids):
+        polygon_id_strs = [str(polygon_id) for polygon_id in polygon_ids]
+        if not polygon_id_strs: return False
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path); cursor = conn.cursor(); polygon_id_str = str(polygon_id)
-            cursor.execute("DELETE FROM polygons WHERE polygon_id = ?", (polygon_id_str,)); deleted_rows = cursor.rowcount; conn.commit(); return deleted_rows > 0
-        except Exception as e: print(f"Error deleting polygon {polygon_id}: {e}"); return False
+            conn = self._connect(); cursor = conn.cursor(); placeholders = ",".join("?" * len(polygon_id_strs))
+            cursor.execute(f"DELETE FROM polygons WHERE polygon_id IN ({placeholders})", polygon_id_strs); deleted_rows = cursor.rowcount
+            if deleted_rows > 0: conn.commit()
+            return deleted_rows > 0
+        except Exception as e: print(f"Error deleting polygons {polygon_id_strs}: {e}"); return False
         finally:
             if conn: conn.close()
             
     def delete_all_polygons(self):
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path); cursor = conn.cursor()
+            conn = self._connect(); cursor = conn.cursor()
             cursor.execute("DELETE FROM polygons"); deleted_rows = cursor.rowcount; conn.commit(); print(f"Deleted {deleted_rows} polygons."); return True
         except Exception as e: print(f"Error deleting all polygons: {e}"); return False
         finally:
             if conn: conn.close()
             
     def get_next_polygon_id(self):
-        conn = None; ids = []
+        conn = None; max_id = 0
         try:
-            conn = sqlite3.connect(self.db_path); cursor = conn.cursor(); cursor.execute("SELECT polygon_id FROM polygons"); ids = cursor.fetchall()
+            # 'poly-<n>' IDs only; the PK index lets SQLite range-scan the 'poly-' prefix
+            conn = self._connect(); cursor = conn.cursor()
+            cursor.execute("SELECT COALESCE(MAX(CAST(substr(polygon_id, 6) AS INTEGER)), 0) FROM polygons WHERE polygon_id GLOB 'poly-[0-9]*' AND substr(polygon_id, 6) NOT GLOB '*[^0-9]*'"); max_id = cursor.fetchone()[0]
         except Exception as e: print(f"Error getting next polygon ID: {e}")
         finally:
             if conn: conn.close()
-        numeric_ids = []
-        for id_tuple in ids:
-            try:
-                if isinstance(id_tuple[0], str) and id_tuple[0].startswith('poly-'):
-                     numeric_part = id_tuple[0].split('-')[-1]; numeric_ids.append(int(numeric_part))
-            except (ValueError, IndexError, TypeError): pass
-        return max(numeric_ids, default=0) + 1
+        return max_id + 1
 
     # --- Image Metadata Methods ---
     def index_image_files(self, base_folder="data/bear_pictures", reindex=False):
         """Scan directory and index image files, checking ONLY device and trail_processed."""
-        start_time = datetime.now()
+        start_time = time.perf_counter() # monotonic and high-resolution, unlike the wall clock
         conn = None
         images_indexed = 0
         folders_processed = 0
@@ -426,31 +557,60 @@ class WildlifeDatabase:
         total_files_found = 0
 
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             if reindex:
                 print("Reindexing: Clearing existing image metadata...")
+                # Not committed here: the delete shares the re-insert's transaction, so a failed reindex rolls back to the old rows
                 cursor.execute("DELETE FROM image_metadata")
-                conn.commit()
-                print("Existing image metadata cleared.")
-
-            if not os.path.isdir(base_folder):
-                 print(f"Error: Base image folder '{base_folder}' not found.")
-                 return 0
+                # Building each index once after the bulk insert is cheaper than maintaining it row by row
+                for index_name in _IMAGE_INDEXES: cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+                print("Existing image metadata cleared (pending commit).")
 
             print(f"Starting image scan in '{base_folder}'...")
             try:
-                device_dirs = os.listdir(base_folder)
+                # One scandir both checks the base folder exists and lists it with file types
+                with os.scandir(base_folder) as it:
+                    device_entries = list(it)
+            except (FileNotFoundError, NotADirectoryError):
+                print(f"Error: Base image folder '{base_folder}' not found.")
+                return 0
             except OSError as e_list_base:
                 print(f"!!! OS error listing base directory {base_folder}: {e_list_base}")
                 return 0
 
-            print(f"Found {len(device_dirs)} items in base folder.")
+            print(f"Found {len(device_entries)} items in base folder.")
+
+            # Listing the subfolders is I/O-bound, so read them all concurrently up front;
+            # the inserts below stay on this thread with the one connection
+            subfolder_paths = [os.path.join(entry.path, subfolder) for entry in device_entries if entry.is_dir() for subfolder in ("device", "trail_processed")]
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                listings = dict(zip(subfolder_paths, pool.map(_list_dir, subfolder_paths)))
+
+            # Rows are inserted in executemany batches; the transaction stays open until the final commit
+            buffer = []
+            def flush_buffer():
+                nonlocal images_indexed, skipped_files
+                changes_before = conn.total_changes
+                try:
+                    cursor.executemany(_IMAGE_INSERT_SQL, buffer); images_indexed += len(buffer)
+                except Exception:
+                    # A full reindex is all-or-nothing: re-raise so the rollback restores the previous rows
+                    if reindex: raise
+                    # Rows before the failing one are already in; retry the rest row by row so only the offending files are skipped
+                    inserted = conn.total_changes - changes_before; images_indexed += inserted
+                    for record in buffer[inserted:]:
+                        try:
+                            cursor.execute(_IMAGE_INSERT_SQL, record); images_indexed += 1
+                        except Exception as e_insert:
+                            print(f"      !!! Error inserting metadata for {record[1]}: {e_insert}")
+                            skipped_files += 1
+                buffer.clear()
 
             # --- Start loop for each item in base_folder ---
-            for device_dir in device_dirs:
-                device_path = os.path.join(base_folder, device_dir)
-                if not os.path.isdir(device_path):
+            for device_entry in device_entries:
+                device_dir = device_entry.name; device_path = device_entry.path
+                if not device_entry.is_dir():
                     print(f"  Skipping non-directory item: {device_dir}")
                     continue
 
@@ -470,45 +630,41 @@ class WildlifeDatabase:
                 def process_image_folder(image_folder_path, image_type):
                     nonlocal images_indexed, skipped_files, total_files_found
                     print(f"  Scanning Subfolder: {image_folder_path} (Type: {image_type})")
-                    if os.path.isdir(image_folder_path):
-                        files_processed_in_folder = 0
-                        try:
-                            files_in_folder = os.listdir(image_folder_path)
-                            print(f"    Found {len(files_in_folder)} items.")
-                            for img_file in files_in_folder:
-                                total_files_found += 1
-                                file_path = os.path.join(image_folder_path, img_file)
-                                if os.path.isfile(file_path) and img_file.lower().endswith(('.jpg', '.jpeg', '.png')):
-                                    files_processed_in_folder += 1
-                                    is_unsuccessful = "unsuccessful_parsing" in img_file and image_type == "trail_processed"
-                                    parsed_successfully = not is_unsuccessful
-                                    storage_image_type = "trail" if image_type == "trail_processed" else "device"
-                                    timestamp = self._extract_timestamp_from_filename(img_file, image_type)
-                                    img_path = file_path.replace("\\", "/")
-                                    try:
-                                        cursor.execute(
-                                            """INSERT INTO image_metadata
-                                               (device_id, image_path, image_type, filename, timestamp, parsed_successfully)
-                                               VALUES (?, ?, ?, ?, ?, ?)""",
-                                            (device_id_cleaned, img_path, storage_image_type, img_file, timestamp, parsed_successfully)
-                                        )
-                                        images_indexed += 1
-                                    except Exception as e_insert:
-                                         print(f"      !!! Error inserting metadata for {img_path}: {e_insert}")
-                                         skipped_files += 1
-                                else:
-                                     skipped_files += 1
-                            print(f"    Finished processing {files_processed_in_folder} potential images in this subfolder.")
-                        except OSError as e_os:
-                            print(f"    !!! OS error reading folder {image_folder_path}: {e_os}")
-                            skipped_files += 1
-                    else:
-                         print(f"    Subfolder not found or not a directory: {image_folder_path}")
+                    # A missing subfolder shows up as the error scandir raised, not a separate stat;
+                    # scandir entries carry the file type, so no extra stat per file either
+                    files_processed_in_folder = 0
+                    entries = listings[image_folder_path]
+                    if isinstance(entries, (FileNotFoundError, NotADirectoryError)):
+                        print(f"    Subfolder not found or not a directory: {image_folder_path}")
+                        return
+                    if isinstance(entries, OSError):
+                        print(f"    !!! OS error reading folder {image_folder_path}: {entries}")
+                        skipped_files += 1
+                        return
+                    print(f"    Found {len(entries)} items.")
+                    for entry in entries:
+                        total_files_found += 1
+                        img_file = entry.name
+                        file_path = entry.path
+                        if not img_file.startswith('.') and os.path.splitext(img_file)[1].lower() in _IMG_EXTS and entry.is_file():
+                            files_processed_in_folder += 1
+                            is_unsuccessful = "unsuccessful_parsing" in img_file and image_type == "trail_processed"
+                            parsed_successfully = not is_unsuccessful
+                            storage_image_type = "trail" if image_type == "trail_processed" else "device"
+                            timestamp = self._extract_timestamp_from_filename(img_file, image_type)
+                            hour = int(timestamp[11:13]) if timestamp else None
+                            img_path = file_path.replace("\\", "/")
+                            buffer.append((device_id_cleaned, img_path, storage_image_type, img_file, timestamp, parsed_successfully, hour))
+                            if len(buffer) >= _IMAGE_BATCH_SIZE: flush_buffer()
+                        else:
+                             skipped_files += 1
+                    print(f"    Finished processing {files_processed_in_folder} potential images in this subfolder.")
 
                 # Process image folders
                 process_image_folder(os.path.join(device_path, "device"), "device")
                 process_image_folder(os.path.join(device_path, "trail_processed"), "trail_processed")
 
+            if buffer: flush_buffer()
             # Commit after processing ALL device folders
             print("\nCommitting all indexed image metadata...")
             conn.commit()
@@ -516,13 +672,22 @@ class WildlifeDatabase:
 
         except Exception as e:
              print(f"!!! Error during image indexing main process: {e}")
-             if conn: conn.rollback()
+             # Nothing from this run is kept after the rollback
+             if conn: conn.rollback(); images_indexed = 0
         finally:
              if conn:
+                 # An early return leaves the reindex uncommitted; roll it back rather than commit it with the indexes below
+                 if conn.in_transaction: conn.rollback()
+                 if reindex:
+                     # Recreated even if the scan failed, so lookups never run without them
+                     try:
+                         for index_name, index_target in _IMAGE_INDEXES.items(): conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {index_target}")
+                         conn.commit()
+                     except sqlite3.Error as e_index: print(f"!!! Error recreating image indexes: {e_index}")
                  print("Closing database connection for image indexing.")
                  conn.close()
 
-        elapsed_time = (datetime.now() - start_time).total_seconds()
+        elapsed_time = time.perf_counter() - start_time
         print(f"\n--- Image Indexing Summary ---")
         print(f"Processed {folders_processed} potential device folders.")
         print(f"Encountered {total_files_found} total file system items in relevant subfolders.")
@@ -540,49 +705,68 @@ class WildlifeDatabase:
                 if "unsuccessful_parsing" in filename: return None
                 base_name = os.path.splitext(filename)[0]; parts = base_name.split('.'); date_part = base_name
                 if len(parts) >= 4 and all(p.isdigit() for p in parts[-4:]): date_part = ".".join(parts[-4:])
-                dt_obj = datetime.strptime(date_part, "%Y.%m.%d.%H%M"); return dt_obj.isoformat()
+                return _parse_date_token(date_part)
             elif logic_type == "device":
                 parts = filename.split('_')
                 if len(parts) >= 3:
-                    date_str = parts[2]; date_str_cleaned = "".join(filter(lambda c: c.isdigit() or c == '.', date_str))
-                    dt_obj = datetime.strptime(date_str_cleaned, "%Y.%m.%d.%H%M"); return dt_obj.isoformat()
+                    date_str = parts[2]; date_str_cleaned = _NON_DATE_CHARS_RE.sub('', date_str)
+                    return _parse_date_token(date_str_cleaned)
         except (ValueError, IndexError, TypeError): pass
         return None
 
-    def get_images(self, device_id, image_type=None, start_date=None, end_date=None, daily_time_filter=None, include_unsuccessful=False, limit=100, offset=0):
+    def _image_filter_clause(self, device_id, image_type, start_date, end_date, daily_time_filter, include_unsuccessful):
+        """WHERE clause and parameters shared by get_images and get_image_count"""
+        if device_id is not None: query = " WHERE device_id = ?"; params = [str(device_id)]
+        else: query = " WHERE 1=1"; params = []
+        if image_type: query += " AND image_type = ?"; params.append(image_type)
+        if not include_unsuccessful: query += " AND parsed_successfully = 1"
+        if start_date and end_date:
+            start_iso = start_date.isoformat() if isinstance(start_date, datetime) else start_date; end_iso = end_date.isoformat() if isinstance(end_date, datetime) else end_date
+            query += " AND timestamp >= ? AND timestamp <= ?"; params.extend([start_iso, end_iso])
+        if daily_time_filter:
+            start_hour, end_hour = daily_time_filter
+            if start_hour <= end_hour: query += " AND hour BETWEEN ? AND ?"; params.extend([start_hour, end_hour])
+            else: query += " AND (hour >= ? OR hour <= ?)"; params.extend([start_hour, end_hour])
+        return query, params
+
+    def get_images(self, device_id, image_type=None, start_date=None, end_date=None, daily_time_filter=None, include_unsuccessful=False, limit=100, offset=0, columns=None):
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path); device_id_str = str(device_id); query = "SELECT * FROM image_metadata WHERE device_id = ?"; params = [device_id_str]
-            if image_type: query += " AND image_type = ?"; params.append(image_type)
-            if not include_unsuccessful: query += " AND parsed_successfully = 1"
-            if start_date and end_date:
-                start_iso = start_date.isoformat() if isinstance(start_date, datetime) else start_date; end_iso = end_date.isoformat() if isinstance(end_date, datetime) else end_date
-                query += " AND timestamp >= ? AND timestamp <= ?"; params.extend([start_iso, end_iso])
-            if daily_time_filter:
-                start_hour, end_hour = daily_time_filter; hour_extract = "CAST(strftime('%H', timestamp) AS INTEGER)"
-                if start_hour <= end_hour: query += f" AND {hour_extract} BETWEEN ? AND ?"; params.extend([start_hour, end_hour])
-                else: query += f" AND ({hour_extract} >= ? OR {hour_extract} <= ?)"; params.extend([start_hour, end_hour])
-            query += " ORDER BY timestamp DESC LIMIT ? OFFSET ?"; params.extend([limit, offset])
+            conn = self._connect(); where, params = self._image_filter_clause(device_id, image_type, start_date, end_date, daily_time_filter, include_unsuccessful)
+            # id breaks timestamp ties so pages don't overlap
+            # device_id is always selected so the dtype mapping below applies
+            select_cols = ", ".join(dict.fromkeys(("device_id",) + tuple(columns))) if columns else "*"
+            query = f"SELECT {select_cols} FROM image_metadata" + where + " ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?"; params.extend([limit, offset])
             df = pd.read_sql(query, conn, params=params, dtype={'device_id': str})
         except Exception as e: print(f"!!! Error executing get_images query: {e}"); df = pd.DataFrame()
         finally:
              if conn: conn.close()
         return df
 
-    def get_image_count(self, device_id, image_type=None, include_unsuccessful=False):
+    def get_image_count(self, device_id, image_type=None, include_unsuccessful=False, start_date=None, end_date=None, daily_time_filter=None):
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path); cursor = conn.cursor()
-            if device_id is not None: device_id_str = str(device_id); query = "SELECT COUNT(*) FROM image_metadata WHERE device_id = ?"; params = [device_id_str]
-            else: query = "SELECT COUNT(*) FROM image_metadata WHERE 1=1"; params = []
-            if image_type: query += " AND image_type = ?"; params.append(image_type)
-            if not include_unsuccessful: query += " AND parsed_successfully = 1"
-            cursor.execute(query, params); count = cursor.fetchone()[0]
+            conn = self._connect(); cursor = conn.cursor(); where, params = self._image_filter_clause(device_id, image_type, start_date, end_date, daily_time_filter, include_unsuccessful)
+            cursor.execute("SELECT COUNT(*) FROM image_metadata" + where, params); count = cursor.fetchone()[0]
         except Exception as e: print(f"Error getting image count: {e}"); count = 0
         finally:
             if conn: conn.close()
         return count
 
+    def get_image_counts(self, include_unsuccessful=False):
+        """Image counts for every device in one query, as {(device_id, image_type): count}"""
+        conn = None; counts = {}
+        try:
+            conn = self._connect(); cursor = conn.cursor()
+            query = "SELECT device_id, image_type, COUNT(*) FROM image_metadata"
+            if not include_unsuccessful: query += " WHERE parsed_successfully = 1"
+            cursor.execute(query + " GROUP BY device_id, image_type")
+            counts = {(device_id, image_type): count for device_id, image_type, count in cursor.fetchall()}
+        except Exception as e: print(f"Error getting image counts: {e}")
+        finally:
+            if conn: conn.close()
+        return counts
+
     # --- New Carpathian Bears Data Methods ---
     
     def _transform_coordinates(self, x, y):
@@ -596,6 +780,13 @@ class WildlifeDatabase:
             print(f"Error transforming coordinates ({x}, {y}): {e}")
             return None, None
     
+    def _transform_coordinates_array(self, x, y):
+        """Vectorized _transform_coordinates: (lat, lng) arrays with NaN wherever a point is missing or fails to project"""
+        x = np.asarray(x, dtype=float); y = np.asarray(y, dtype=float)
+        lng, lat = self.transformer.transform(x, y)
+        invalid = ~(np.isfinite(lat) & np.isfinite(lng))
+        return np.where(invalid, np.nan, lat), np.where(invalid, np.nan, lng)
+
     def import_bears_data(self, csv_path="data/animal_data/carpathian_bears/1_bears_RO.csv"):
         """Import Carpathian Bears tracking data with properly formatted timestamps"""
         if not os.path.exists(csv_path):
@@ -636,7 +827,7 @@ class WildlifeDatabase:
             
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             
             # Clear existing data
@@ -648,51 +839,56 @@ class WildlifeDatabase:
             count = 0
             failed_count = 0
             
-            for _, row in df.iterrows():
-                try:
-                    # Transform coordinates from EPSG:3844 to WGS84
-                    lat, lng = self._transform_coordinates(row.get('X'), row.get('Y'))
-                    
-                    # Prepare timestamp - ENSURE ISO FORMAT STRING
-                    ts_iso = None
-                    if timestamp_col and pd.notna(row.get(timestamp_col)):
-                        ts_iso = row[timestamp_col].isoformat()
-                    
-                    # Determine if it's daytime (between 6 AM and 8 PM)
-                    is_daytime = False
-                    if timestamp_col and pd.notna(row.get(timestamp_col)):
-                        try:
-                            hour = row[timestamp_col].hour
-                            is_daytime = 6 <= hour < 20
-                        except:
-                            pass
-                            
-                    cursor.execute(
-                        """INSERT INTO bears_tracking 
-                        (bear_id, timestamp, x, y, lat, lng, season_code, season, sex, age, is_daytime) 
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                        (
-                            str(row.get('Name', '')).strip() if pd.notna(row.get('Name')) else None,
+            # Reproject every point in one PROJ call instead of once per row
+            df['_lat'], df['_lng'] = self._transform_coordinates_array(df.get('X', np.nan), df.get('Y', np.nan))
+            
+            def tracking_rows():
+                nonlocal count, failed_count
+                # One plain tuple at a time over the needed columns; reindex turns any column the CSV lacks
+                # (including the timestamp when there is none) into NaN, stored as NULL
+                columns = ['Name', timestamp_col or 'timestamp', 'X', 'Y', '_lat', '_lng', 'Season', 'Season2', 'Sex', 'age']
+                for name, ts, x, y, lat, lng, season_code, season, sex, age in df.reindex(columns=columns).itertuples(index=False, name=None):
+                    try:
+                        # Prepare timestamp - ENSURE ISO FORMAT STRING
+                        ts_iso = None
+                        # Determine if it's daytime (between 6 AM and 8 PM)
+                        is_daytime = False
+                        if pd.notna(ts):
+                            ts_iso = ts.isoformat()
+                            is_daytime = 6 <= ts.hour < 20
+                                
+                        record = (
+                            str(name).strip() if pd.notna(name) else None,
                             ts_iso,  # This should be a proper ISO formatted timestamp string
-                            row.get('X'),
-                            row.get('Y'),
-                            lat,
+                            x,
+                            y,
+                            lat,  # transformed above; NaN is stored as NULL
                             lng,
-                            str(row.get('Season', '')).strip() if pd.notna(row.get('Season')) else None,
-                            str(row.get('Season2', '')).strip() if pd.notna(row.get('Season2')) else None,
-                            str(row.get('Sex', '')).strip() if pd.notna(row.get('Sex')) else None,
-                            str(row.get('age', '')).strip() if pd.notna(row.get('age')) else None,
+                            str(season_code).strip() if pd.notna(season_code) else None,
+                            str(season).strip() if pd.notna(season) else None,
+                            str(sex).strip() if pd.notna(sex) else None,
+                            str(age).strip() if pd.notna(age) else None,
                             is_daytime
                         )
-                    )
+                    except Exception as e:
+                        print(f"Error preparing bear tracking record: {e}")
+                        failed_count += 1
+                        continue
+                    yield record
                     count += 1
                     if count % 1000 == 0:
                         print(f"Processed {count} records...")
-                except Exception as e:
-                    print(f"Error inserting bear tracking record: {e}")
-                    failed_count += 1
-                    continue
             
+            # Rows are built lazily and streamed into one executemany instead of an execute per row
+            cursor.executemany(
+                """INSERT INTO bears_tracking 
+                (bear_id, timestamp, x, y, lat, lng, season_code, season, sex, age, is_daytime) 
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                tracking_rows()
+            )
+            
+            # The seasonal summary is derived from bears_tracking, so rebuild it in the same transaction
+            _rebuild_seasonal_stats(cursor)
             # Commit changes
             conn.commit()
             print(f"Imported {count} bear tracking records, failed {failed_count}")
@@ -752,58 +948,63 @@ class WildlifeDatabase:
             
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             
             # Insert seasonal data
             count = 0
             failed_count = 0
             
-            for _, row in df.iterrows():
-                try:
-                    # Transform coordinates
-                    lat, lng = self._transform_coordinates(row.get('X'), row.get('Y'))
-                    
-                    # Prepare timestamp - ENSURE ISO FORMAT STRING
-                    ts_iso = None
-                    if timestamp_col and pd.notna(row.get(timestamp_col)):
-                        ts_iso = row[timestamp_col].isoformat()
-                    
-                    # Determine if it's daytime (between 6 AM and 8 PM)
-                    is_daytime = False
-                    if timestamp_col and pd.notna(row.get(timestamp_col)):
-                        try:
-                            hour = row[timestamp_col].hour
-                            is_daytime = 6 <= hour < 20
-                        except:
-                            pass
-                            
-                    cursor.execute(
-                        """INSERT INTO bears_tracking 
-                        (bear_id, timestamp, x, y, lat, lng, season_code, season, sex, age, is_daytime) 
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                        (
-                            str(row.get('Name', '')).strip() if pd.notna(row.get('Name')) else None,
+            # Reproject every point in one PROJ call instead of once per row
+            df['_lat'], df['_lng'] = self._transform_coordinates_array(df.get('X', np.nan), df.get('Y', np.nan))
+            
+            def tracking_rows():
+                nonlocal count, failed_count
+                # One plain tuple at a time over the needed columns; reindex turns any column the CSV lacks
+                # (including the timestamp when there is none) into NaN, stored as NULL
+                columns = ['Name', timestamp_col or 'timestamp', 'X', 'Y', '_lat', '_lng', 'Season', 'Season2', 'Sex', 'age']
+                for name, ts, x, y, lat, lng, season_code, season, sex, age in df.reindex(columns=columns).itertuples(index=False, name=None):
+                    try:
+                        # Prepare timestamp - ENSURE ISO FORMAT STRING
+                        ts_iso = None
+                        # Determine if it's daytime (between 6 AM and 8 PM)
+                        is_daytime = False
+                        if pd.notna(ts):
+                            ts_iso = ts.isoformat()
+                            is_daytime = 6 <= ts.hour < 20
+                                
+                        record = (
+                            str(name).strip() if pd.notna(name) else None,
                             ts_iso,  # This should be a proper ISO formatted timestamp string
-                            row.get('X'),
-                            row.get('Y'),
-                            lat,
+                            x,
+                            y,
+                            lat,  # transformed above; NaN is stored as NULL
                             lng,
-                            str(row.get('Season', '')).strip() if pd.notna(row.get('Season')) else None,
-                            str(row.get('Season2', '')).strip() if pd.notna(row.get('Season2')) else None,
-                            str(row.get('Sex', '')).strip() if pd.notna(row.get('Sex')) else None,
-                            str(row.get('age', '')).strip() if pd.notna(row.get('age')) else None,
+                            str(season_code).strip() if pd.notna(season_code) else None,
+                            str(season).strip() if pd.notna(season) else None,
+                            str(sex).strip() if pd.notna(sex) else None,
+                            str(age).strip() if pd.notna(age) else None,
                             is_daytime
                         )
-                    )
+                    except Exception as e:
+                        print(f"Error preparing bear seasonal record: {e}")
+                        failed_count += 1
+                        continue
+                    yield record
                     count += 1
                     if count % 1000 == 0:
                         print(f"Processed {count} seasonal records...")
-                except Exception as e:
-                    print(f"Error inserting bear seasonal record: {e}")
-                    failed_count += 1
-                    continue
             
+            # Rows are built lazily and streamed into one executemany instead of an execute per row
+            cursor.executemany(
+                """INSERT INTO bears_tracking 
+                (bear_id, timestamp, x, y, lat, lng, season_code, season, sex, age, is_daytime) 
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                tracking_rows()
+            )
+            
+            # The seasonal summary is derived from bears_tracking, so rebuild it in the same transaction
+            _rebuild_seasonal_stats(cursor)
             conn.commit()
             print(f"Imported {count} bear seasonal records, failed {failed_count}")
             
@@ -844,7 +1045,7 @@ class WildlifeDatabase:
             
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             
             # Clear existing data
@@ -856,19 +1057,20 @@ class WildlifeDatabase:
             count = 0
             failed_count = 0
             
-            for _, row in df.iterrows():
+            # Plain tuples over the needed columns; reindex turns any column the CSV lacks into NaN (stored as NULL)
+            for bear_id, area, sex, age, num_gmu, stage in df.reindex(columns=['id', 'area', 'Sex', 'age', 'No_GMU', 'Stage']).itertuples(index=False, name=None):
                 try:
                     cursor.execute(
                         """INSERT INTO bears_mcp 
                            (bear_id, area, sex, age, num_gmu, stage) 
                            VALUES (?, ?, ?, ?, ?, ?)""",
                         (
-                            str(row.get('id', '')).strip() if pd.notna(row.get('id')) else None,
-                            row.get('area'),
-                            str(row.get('Sex', '')).strip() if pd.notna(row.get('Sex')) else None,
-                            str(row.get('age', '')).strip() if pd.notna(row.get('age')) else None,
-                            row.get('No_GMU'),
-                            str(row.get('Stage', '')).strip() if pd.notna(row.get('Stage')) else None
+                            str(bear_id).strip() if pd.notna(bear_id) else None,
+                            area,
+                            str(sex).strip() if pd.notna(sex) else None,
+                            str(age).strip() if pd.notna(age) else None,
+                            num_gmu,
+                            str(stage).strip() if pd.notna(stage) else None
                         )
                     )
                     count += 1
@@ -907,7 +1109,7 @@ class WildlifeDatabase:
             
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             
             # Clear existing data
@@ -919,17 +1121,18 @@ class WildlifeDatabase:
             count = 0
             failed_count = 0
             
-            for _, row in df.iterrows():
+            # Plain tuples over the needed columns; reindex turns any column the CSV lacks into NaN (stored as NULL)
+            for bear_id, sex, age, area in df.reindex(columns=['id', 'Sex', 'age', 'area']).itertuples(index=False, name=None):
                 try:
                     cursor.execute(
                         """INSERT INTO bears_core_area 
                            (bear_id, sex, age, area) 
                            VALUES (?, ?, ?, ?)""",
                         (
-                            str(row.get('id', '')).strip() if pd.notna(row.get('id')) else None,
-                            str(row.get('Sex', '')).strip() if pd.notna(row.get('Sex')) else None,
-                            str(row.get('age', '')).strip() if pd.notna(row.get('age')) else None,
-                            row.get('area')
+                            str(bear_id).strip() if pd.notna(bear_id) else None,
+                            str(sex).strip() if pd.notna(sex) else None,
+                            str(age).strip() if pd.notna(age) else None,
+                            area
                         )
                     )
                     count += 1
@@ -970,7 +1173,7 @@ class WildlifeDatabase:
             
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             
             # Clear existing data
@@ -982,19 +1185,20 @@ class WildlifeDatabase:
             count = 0
             failed_count = 0
             
-            for _, row in df.iterrows():
+            # Plain tuples over the needed columns; reindex turns any column the CSV lacks into NaN (stored as NULL)
+            for bear_id, area, sex, age, num_gmu, stage in df.reindex(columns=['id', 'area', 'Sex', 'age', 'No_GMU', 'Stage']).itertuples(index=False, name=None):
                 try:
                     cursor.execute(
                         """INSERT INTO bears_kde 
                            (bear_id, area, sex, age, num_gmu, stage) 
                            VALUES (?, ?, ?, ?, ?, ?)""",
                         (
-                            str(row.get('id', '')).strip() if pd.notna(row.get('id')) else None,
-                            row.get('area'),
-                            str(row.get('Sex', '')).strip() if pd.notna(row.get('Sex')) else None,
-                            str(row.get('age', '')).strip() if pd.notna(row.get('age')) else None,
-                            row.get('No_GMU'),
-                            str(row.get('Stage', '')).strip() if pd.notna(row.get('Stage')) else None
+                            str(bear_id).strip() if pd.notna(bear_id) else None,
+                            area,
+                            str(sex).strip() if pd.notna(sex) else None,
+                            str(age).strip() if pd.notna(age) else None,
+                            num_gmu,
+                            str(stage).strip() if pd.notna(stage) else None
                         )
                     )
                     count += 1
@@ -1032,7 +1236,7 @@ class WildlifeDatabase:
             
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             
             # Clear existing data
@@ -1044,16 +1248,17 @@ class WildlifeDatabase:
             count = 0
             failed_count = 0
             
-            for _, row in df.iterrows():
+            # Plain tuples over the needed columns; reindex turns any column the CSV lacks into NaN (stored as NULL)
+            for bear_id, area, season in df.reindex(columns=['id', 'area', 'Season']).itertuples(index=False, name=None):
                 try:
                     cursor.execute(
                         """INSERT INTO bears_seasonal_mcp 
                            (bear_id, area, season) 
                            VALUES (?, ?, ?)""",
                         (
-                            str(row.get('id', '')).strip() if pd.notna(row.get('id')) else None,
-                            row.get('area'),
-                            str(row.get('Season', '')).strip() if pd.notna(row.get('Season')) else None
+                            str(bear_id).strip() if pd.notna(bear_id) else None,
+                            area,
+                            str(season).strip() if pd.notna(season) else None
                         )
                     )
                     count += 1
@@ -1102,7 +1307,7 @@ class WildlifeDatabase:
             
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             
             # Clear existing data
@@ -1114,28 +1319,31 @@ class WildlifeDatabase:
             count = 0
             failed_count = 0
             
-            for _, row in df.iterrows():
+            # Reproject every point in one PROJ call instead of once per row
+            df['_lat'], df['_lng'] = self._transform_coordinates_array(df.get('X', np.nan), df.get('Y', np.nan))
+            
+            # Plain tuples over the needed columns; reindex turns any column the CSV lacks into NaN (stored as NULL),
+            # and lat/lng come from the transform above
+            columns = ['Name', 'X', 'Y', '_lat', '_lng', 'Date', 'dist', 'Season', 'alt']
+            for name, x, y, lat, lng, date, dist, season, alt in df.reindex(columns=columns).itertuples(index=False, name=None):
                 try:
-                    # Transform coordinates
-                    lat, lng = self._transform_coordinates(row.get('X'), row.get('Y'))
-                    
                     # Prepare date
-                    date_iso = row['Date'].isoformat() if pd.notna(row.get('Date')) else None
+                    date_iso = date.isoformat() if pd.notna(date) else None
                     
                     cursor.execute(
                         """INSERT INTO bears_daily_displacement 
                            (bear_id, x, y, lat, lng, date, distance, season, altitude) 
                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
                         (
-                            str(row.get('Name', '')).strip() if pd.notna(row.get('Name')) else None,
-                            row.get('X'),
-                            row.get('Y'),
+                            str(name).strip() if pd.notna(name) else None,
+                            x,
+                            y,
                             lat,
                             lng,
                             date_iso,
-                            row.get('dist'),
-                            str(row.get('Season', '')).strip() if pd.notna(row.get('Season')) else None,
-                            row.get('alt')
+                            dist,
+                            str(season).strip() if pd.notna(season) else None,
+                            alt
                         )
                     )
                     count += 1
@@ -1162,7 +1370,7 @@ class WildlifeDatabase:
         """Get a list of all bears in the database with basic information"""
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             query = """
             SELECT DISTINCT 
                 bear_id, 
@@ -1182,40 +1390,34 @@ class WildlifeDatabase:
             if conn: conn.close()
         return df
     
+    def refresh_seasonal_stats(self):
+        """Rebuild bears_seasonal_stats from bears_tracking; run after anything that rewrites tracking data"""
+        conn = None
+        try:
+            conn = self._connect(); cursor = conn.cursor()
+            _rebuild_seasonal_stats(cursor); conn.commit(); return True
+        except Exception as e:
+            print(f"!!! Error refreshing seasonal stats: {e}")
+            if conn: conn.rollback()
+            return False
+        finally:
+            if conn: conn.close()
+
     def get_seasonal_data(self, bear_id=None):
         """Get seasonal movement data for bears"""
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
-            query = """
-            SELECT 
-                bear_id,
-                season,
-                sex,
-                age,
-                COUNT(*) as point_count,
-                AVG(x) as avg_x,
-                AVG(y) as avg_y,
-                MIN(x) as min_x,
-                MAX(x) as max_x,
-                MIN(y) as min_y,
-                MAX(y) as max_y,
-                MIN(lat) as min_lat,
-                MAX(lat) as max_lat,
-                MIN(lng) as min_lng,
-                MAX(lng) as max_lng,
-                COUNT(DISTINCT date(timestamp)) as day_count
-            FROM bears_tracking
-            """
+            conn = self._connect()
+            # Read the precomputed summary when it exists; older databases fall back to the live aggregate
+            has_stats = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'bears_seasonal_stats'").fetchone()
+            query = "SELECT * FROM " + ("bears_seasonal_stats" if has_stats else f"({_SEASONAL_STATS_QUERY})")
             params = []
             
             if bear_id:
-                query += " WHERE bear_id = ? AND bear_id IS NOT NULL"
+                query += " WHERE bear_id = ?"
                 params.append(bear_id)
-            else:
-                query += " WHERE bear_id IS NOT NULL"
                 
-            query += " GROUP BY bear_id, season, sex, age ORDER BY bear_id, season"
+            query += " ORDER BY bear_id, season"
             
             df = pd.read_sql(query, conn, params=params)
         except Exception as e:
@@ -1229,7 +1431,7 @@ class WildlifeDatabase:
         """Get home range data for bears"""
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             query = """
             SELECT 
                 m.bear_id,
@@ -1266,7 +1468,7 @@ class WildlifeDatabase:
         """Get daily movement data for bears"""
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             query = """
             SELECT 
                 bear_id,
@@ -1319,7 +1521,7 @@ class WildlifeDatabase:
         """Get tracking data for one or all bears with filtering options"""
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             
             # Build query with parameters
             query = "SELECT * FROM bears_tracking WHERE 1=1"
@@ -1345,7 +1547,9 @@ class WildlifeDatabase:
                 
             query += " ORDER BY bear_id, timestamp"
             
-            df = pd.read_sql(query, conn, params=params)
+            # Tracking points are the largest frame we load; float32 coordinates halve their footprint
+            # while keeping well under a metre of precision
+            df = pd.read_sql(query, conn, params=params, dtype={'x': 'float32', 'y': 'float32', 'lat': 'float32', 'lng': 'float32'})
             
             # Convert timestamp strings to datetime
             if not df.empty and 'timestamp' in df.columns:
@@ -1362,7 +1566,7 @@ class WildlifeDatabase:
         """Get the minimum and maximum date from a specific column in a table"""
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             query = f"SELECT MIN({date_column}), MAX({date_column}) FROM {table_name} WHERE {date_column} IS NOT NULL"
             cursor = conn.cursor()
             cursor.execute(query)
@@ -1392,75 +1596,12 @@ class WildlifeDatabase:
         finally:
             if conn: conn.close()
 
-def fix_timestamp_issues(self):
-    """Fix any issues with timestamps in the database"""
-    conn = None
-    try:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Check for NULL timestamps
-        cursor.execute("SELECT COUNT(*) FROM bears_tracking WHERE timestamp IS NULL")
-        null_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM bears_tracking WHERE timestamp IS NOT NULL")
-        non_null_count = cursor.fetchone()[0]
-        
-        print(f"Timestamp status: {non_null_count} with timestamp, {null_count} without timestamp")
-        
-        if null_count > 0 and non_null_count == 0:
-            print("All timestamps are NULL. Creating artificial timestamps...")
-            
-            # Get the bears and their record counts
-            cursor.execute("SELECT bear_id, COUNT(*) FROM bears_tracking GROUP BY bear_id")
-            bear_counts = cursor.fetchall()
-            
-            base_date = datetime(2018, 1, 1)  # Start with a reasonable date
-            updated_count = 0
-            
-            for bear_id, count in bear_counts:
-                print(f"Processing {count} records for bear {bear_id}...")
-                
-                # Get all records for this bear
-                cursor.execute("SELECT id FROM bears_tracking WHERE bear_id = ? ORDER BY id", (bear_id,))
-                record_ids = [row[0] for row in cursor.fetchall()]
-                
-                # Create evenly spread timestamps
-                for i, record_id in enumerate(record_ids):
-                    # Create a timestamp spaced 1 hour apart for each record
-                    timestamp = base_date + pd.Timedelta(hours=i)
-                    
-                    cursor.execute(
-                        "UPDATE bears_tracking SET timestamp = ? WHERE id = ?",
-                        (timestamp.isoformat(), record_id)
-                    )
-                    updated_count += 1
-                
-                # Advance base date by 6 months for the next bear
-                base_date = base_date + pd.Timedelta(days=180)
-            
-            # Commit changes
-            conn.commit()
-            print(f"Created artificial timestamps for {updated_count} records.")
-            
-            return True
-        else:
-            print("Timestamp data appears to be OK.")
-            return False
-            
-    except Exception as e:
-        print(f"Error fixing timestamps: {e}")
-        if conn: conn.rollback()
-        return False
-    finally:
-        if conn: conn.close()
-
 # Data migration function for Carpathian Bears
 def migrate_carpathian_bears_data():
     """Migrate all Carpathian Bears data to SQLite database"""
     print("--- Starting Carpathian Bears Data Migration ---")
     db = WildlifeDatabase()
-    db.initialize_db()  # Ensure tables exist
+    db.initialize_db(rebuild_bears_tracking=True)  # Ensure tables exist, with bears_tracking on the current schema
     
     bears_csv = "data/animal_data/carpathian_bears/1_bears_RO.csv"
     seasonal_csv = "data/animal_data/carpathian_bears/2_bears_RO_seasons.csv"
@@ -1536,6 +1677,9 @@ def migrate_carpathian_bears_data():
         print("\nChecking for timestamp issues...")
         db.fix_timestamp_issues()
         if final_conn: final_conn.close()
+        print("Refreshing seasonal summary...")
+        db.refresh_seasonal_stats()
+        db.checkpoint()
     
 
 # Complete migration function